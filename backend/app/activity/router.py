@@ -6,6 +6,8 @@ from pydantic import BaseModel
 from .. import models, schemas
 from ..database import get_db
 from ..auth.utils import get_current_user
+from ..cache import response_cache
+from ..notifications.subscriptions import subscription_index
 
 
 router = APIRouter(prefix="/activity", tags=["activity"])
@@ -84,6 +86,8 @@ def upsert_saved_search(
         db.add(saved)
 
     db.commit()
+    subscription_index.add_search(db, saved)
+    response_cache.bump_user(db, user.id)  # /events applies the saved search for this user only
     return {"message": "Saved search updated successfully"}
 
 
@@ -0,0 +1,140 @@
+import argparse
+import time
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Iterable, NamedTuple
+
+from sqlalchemy import case, delete, func, select
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..background import held_lease
+from ..database import upsert_insert
+
+TOTAL = "total"
+DAY = "day"
+SOURCE = "source"
+CITY = "city"
+
+# DB lease held while the rollups are recounted, so API workers and rescores rebuild one at a time
+REBUILD_LEASE = "rollups-rebuild"
+REBUILD_LEASE_SECONDS = 600  # also how long a rebuild waits for another one to finish
+
+
+class Counted(NamedTuple):
+    """The event fields the rollups count by."""
+    created_at: datetime | date | str | None
+    source: str | None
+    city: str | None
+    food_score: int | None
+
+
+def _keys(event: Counted) -> list[tuple[str, str]]:
+    day = event.created_at
+    if isinstance(day, datetime):
+        day = day.date()
+    keys = [(TOTAL, ""), (SOURCE, event.source or "unknown")]
+    if day is not None:
+        keys.append((DAY, str(day)))
+    if event.city is not None:
+        keys.append((CITY, event.city))
+    return keys
+
+
+def deltas(added: Iterable[Counted] = (), removed: Iterable[Counted] = ()) -> dict[tuple[str, str], list[int]]:
+    """(dimension, key) -> [events, food_events] change. An update is its old row removed plus its new row added."""
+    changes: dict[tuple[str, str], list[int]] = defaultdict(lambda: [0, 0])
+    for events, sign in ((added, 1), (removed, -1)):
+        for event in events:
+            food = sign if (event.food_score or 0) > 0 else 0
+            for key in _keys(event):
+                changes[key][0] += sign
+                changes[key][1] += food
+    return {key: change for key, change in changes.items() if change != [0, 0]}
+
+
+def apply_deltas(db: Session, changes: dict[tuple[str, str], list[int]]):
+    """Add count changes to the rollups with one INSERT ... ON CONFLICT DO UPDATE. Does not commit."""
+    if not changes:
+        return
+    stmt = upsert_insert(db, models.EventRollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.EventRollup.dimension, models.EventRollup.key],
+        set_={
+            "events": models.EventRollup.events + stmt.excluded.events,
+            "food_events": models.EventRollup.food_events + stmt.excluded.food_events,
+        },
+    )
+    db.execute(stmt, [
+        {"dimension": dimension, "key": key, "events": events, "food_events": food}
+        for (dimension, key), (events, food) in sorted(changes.items())
+    ])
+
+
+def rebuild_rollups(db: Session) -> int:
+    """
+    Recount every rollup from the events table, replacing what's there. Commits.
+    Waits for a rebuild running in another process to finish first. Returns rows written.
+    """
+    with held_lease(db, REBUILD_LEASE, REBUILD_LEASE_SECONDS, wait_seconds=REBUILD_LEASE_SECONDS) as held:
+        if not held:
+            raise RuntimeError("Another process is still rebuilding the rollups")
+        return _rebuild(db)
+
+
+def _rebuild(db: Session) -> int:
+    is_food = func.sum(case((models.Event.food_score > 0, 1), else_=0))
+    total, food = db.execute(select(func.count(models.Event.id), is_food)).one()
+    rows = [{"dimension": TOTAL, "key": "", "events": total, "food_events": food or 0}]
+    groupings = [
+        (SOURCE, func.coalesce(models.Event.source, "unknown")),
+        (DAY, func.date(models.Event.created_at)),
+        (CITY, models.Event.city),
+    ]
+    for dimension, column in groupings:
+        query = select(column, func.count(models.Event.id), is_food).where(column.isnot(None)).group_by(column)
+        rows.extend(
+            {"dimension": dimension, "key": str(key), "events": events, "food_events": food or 0}
+            for key, events, food in db.execute(query)
+        )
+
+    db.execute(delete(models.EventRollup))
+    db.execute(models.EventRollup.__table__.insert(), rows)
+    db.commit()
+    return len(rows)
+
+
+def ensure_rollups(db: Session):
+    """
+    Build the rollups if they've never been built (new table over existing events).
+    When several API workers start at once, one builds while the others wait for it.
+    """
+    if _built(db):
+        return
+    with held_lease(db, REBUILD_LEASE, REBUILD_LEASE_SECONDS, wait_seconds=REBUILD_LEASE_SECONDS) as held:
+        if not held:
+            print("  [rollups] Another process is still building the rollups")
+            return
+        if _built(db):  # by the process we waited for
+            return
+        start = time.perf_counter()
+        written = _rebuild(db)
+        print(f"  [rollups] Built {written} rollup rows in {time.perf_counter() - start:.1f}s")
+
+
+def _built(db: Session) -> bool:
+    return db.scalar(select(models.EventRollup.events).where(
+        models.EventRollup.dimension == TOTAL, models.EventRollup.key == "",
+    )) is not None
+
+
+if __name__ == "__main__":
+    from ..database import SessionLocal, init_db
+
+    parser = argparse.ArgumentParser(description="Rebuild the analytics rollups from the events table.")
+    parser.parse_args()
+    init_db()
+    with SessionLocal() as db:
+        start = time.perf_counter()
+        written = rebuild_rollups(db)
+    print(f"  [rollups] Rebuilt {written} rollup rows in {time.perf_counter() - start:.1f}s")
@@ -1,34 +1,38 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from .. import models, schemas
+from ..cache import response_cache
 from ..database import get_db
+from .rollups import CITY, DAY, SOURCE, TOTAL
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
 
 @router.get("/overview", response_model=schemas.AnalyticsOverview)
-def overview(db: Session = Depends(get_db)):
-    total = db.query(models.Event).count()
-    food = db.query(models.Event).filter(models.Event.food_score > 0).count()
+def overview(request: Request, db: Session = Depends(get_db)):
+    return response_cache.respond(request, db, "analytics.overview", {}, lambda: _overview(db))
+
+
+def _overview(db: Session) -> schemas.AnalyticsOverview:
+    """Reads the rollups: the total row, one row per source and the top city."""
+    totals = db.get(models.EventRollup, (TOTAL, ""))
 
     # Events by source
-    source_counts = db.query(
-        models.Event.source, func.count(models.Event.id)
-    ).group_by(models.Event.source).all()
+    source_counts = db.query(models.EventRollup.key, models.EventRollup.events).filter(
+        models.EventRollup.dimension == SOURCE, models.EventRollup.events > 0,
+    ).all()
     by_source = {s: c for s, c in source_counts}
 
     # Top city
-    city_counts = db.query(
-        models.Event.city, func.count(models.Event.id)
-    ).filter(models.Event.city != "Unknown").group_by(models.Event.city).order_by(
-        func.count(models.Event.id).desc()
-    ).first()
+    city_counts = db.query(models.EventRollup.key).filter(
+        models.EventRollup.dimension == CITY, models.EventRollup.key != "Unknown",
+        models.EventRollup.events > 0,
+    ).order_by(models.EventRollup.events.desc()).first()
     top_city = city_counts[0] if city_counts else "N/A"
 
     return schemas.AnalyticsOverview(
-        total_events=total,
-        food_events=food,
+        total_events=totals.events if totals else 0,
+        food_events=totals.food_events if totals else 0,
         total_sources=len(by_source),
         top_city=top_city,
         events_by_source=by_source,
@@ -36,13 +40,14 @@ def overview(db: Session = Depends(get_db)):
 
 
 @router.get("/trends", response_model=list[schemas.AnalyticsTrend])
-def trends(db: Session = Depends(get_db)):
+def trends(request: Request, db: Session = Depends(get_db)):
     """Events scraped per day (last 30 days)."""
-    rows = db.query(
-        func.date(models.Event.created_at).label("date"),
-        func.count(models.Event.id).label("count"),
-    ).group_by(func.date(models.Event.created_at)).order_by(
-        func.date(models.Event.created_at).desc()
-    ).limit(30).all()
-
-    return [schemas.AnalyticsTrend(date=str(r.date), count=r.count) for r in rows]
+    return response_cache.respond(request, db, "analytics.trends", {}, lambda: _trends(db))
+
+
+def _trends(db: Session) -> list[schemas.AnalyticsTrend]:
+    rows = db.query(models.EventRollup.key, models.EventRollup.events).filter(
+        models.EventRollup.dimension == DAY, models.EventRollup.events > 0,
+    ).order_by(models.EventRollup.key.desc()).limit(30).all()
+
+    return [schemas.AnalyticsTrend(date=day, count=count) for day, count in rows]
@@ -0,0 +1,154 @@
+import os
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, or_, update
+from sqlalchemy.exc import IntegrityError
+
+from . import models
+from .database import SessionLocal
+
+
+def start_rebuild_loop(tag: str, build, session_factory, refresh_seconds: float,
+                       wake: threading.Event | None = None) -> threading.Thread:
+    """
+    Call build(db) in a daemon thread, then again every refresh_seconds -- or as
+    soon as `wake` is set -- so rows written by other worker processes show up.
+    refresh_seconds <= 0 builds once.
+    """
+    wake = wake or threading.Event()
+
+    def _loop():
+        while True:
+            wake.clear()
+            db = session_factory()
+            try:
+                build(db)
+            except Exception as e:
+                print(f"  [{tag}] Index build failed: {e}")
+            finally:
+                db.close()
+            if refresh_seconds <= 0:
+                return
+            wake.wait(refresh_seconds)
+
+    thread = threading.Thread(target=_loop, name=f"{tag}-index", daemon=True)
+    thread.start()
+    return thread
+
+
+def acquire_lease(db, name: str, holder: str, ttl_seconds: float) -> bool:
+    """Take or renew a named lease in the DB. True while holder owns it."""
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=ttl_seconds)
+    renewed = db.execute(
+        update(models.SchedulerLease)
+        .where(models.SchedulerLease.name == name,
+               or_(models.SchedulerLease.holder == holder, models.SchedulerLease.expires_at < now))
+        .values(holder=holder, expires_at=expires_at)
+    ).rowcount
+    db.commit()
+    if renewed:
+        return True
+    if db.get(models.SchedulerLease, name) is not None:
+        return False
+    try:
+        db.add(models.SchedulerLease(name=name, holder=holder, expires_at=expires_at))
+        db.commit()
+        return True
+    except IntegrityError:  # another process created it first
+        db.rollback()
+        return False
+
+
+def release_lease(db, name: str, holder: str):
+    db.execute(delete(models.SchedulerLease).where(
+        models.SchedulerLease.name == name, models.SchedulerLease.holder == holder,
+    ))
+    db.commit()
+
+
+def lease_holder() -> str:
+    """A holder id for acquire_lease, unique to the caller."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+@contextmanager
+def held_lease(db, name: str, ttl_seconds: float, wait_seconds: float = 0):
+    """
+    Hold a named DB lease around a short critical section, retrying for up to
+    wait_seconds while another process has it. Yields whether it was taken and
+    releases it on exit. The body should commit its own work.
+    """
+    holder = lease_holder()
+    deadline = time.monotonic() + wait_seconds
+    taken = acquire_lease(db, name, holder, ttl_seconds)
+    while not taken and time.monotonic() < deadline:
+        time.sleep(0.1)
+        taken = acquire_lease(db, name, holder, ttl_seconds)
+    try:
+        yield taken
+    except BaseException:
+        db.rollback()
+        raise
+    finally:
+        if taken:
+            release_lease(db, name, holder)
+
+
+class LeasedLoop:
+    """
+    Calls tick(db) every interval_seconds in a daemon thread. Every API process
+    runs one; the holder of the named DB lease (renewed each round, expiring
+    after lease_seconds) is the only one that ticks. Subclasses implement tick().
+    """
+
+    tag = "loop"
+
+    def __init__(self, lease_name: str, interval_seconds: float, lease_seconds: float):
+        self.lease_name = lease_name
+        self.interval_seconds = interval_seconds
+        self.lease_seconds = lease_seconds
+        self.holder = lease_holder()
+        self.leader = False
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.lease_name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(5)
+        self._thread = None
+        if self.leader:
+            with SessionLocal() as db:
+                release_lease(db, self.lease_name, self.holder)
+            self.leader = False
+
+    def tick(self, db):
+        raise NotImplementedError
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                with SessionLocal() as db:
+                    leader = acquire_lease(db, self.lease_name, self.holder, self.lease_seconds)
+                    if leader != self.leader:
+                        print(f"  [{self.tag}] {'Leading' if leader else 'Standing by'}")
+                    self.leader = leader
+                    if leader:
+                        self.tick(db)
+            except Exception as e:
+                print(f"  [{self.tag}] Tick failed: {e}")
+            self._stop.wait(self.interval_seconds)
@@ -0,0 +1,240 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import models
+from .config import get_settings
+
+try:
+    import redis
+except ImportError:  # optional -- only needed for a shared CACHE_URL backend
+    redis = None
+
+settings = get_settings()
+
+VERSION_NAME = "events"
+
+
+def data_version(db: Session, name: str = VERSION_NAME) -> int:
+    """A version counter as stored; "events" is bumped by every committed event write."""
+    return db.scalar(
+        select(models.CacheVersion.version).where(models.CacheVersion.name == name)
+    ) or 0
+
+
+def bump_version(db: Session, name: str = VERSION_NAME) -> int:
+    """Increment a version counter, creating it on first use. Commits. Returns the new version."""
+    bumped = db.execute(
+        update(models.CacheVersion)
+        .where(models.CacheVersion.name == name)
+        .values(version=models.CacheVersion.version + 1)
+    ).rowcount
+    if bumped:
+        version = data_version(db, name)  # our own increment: the row stays locked until commit
+        db.commit()
+        return version
+    db.rollback()
+    try:
+        db.add(models.CacheVersion(name=name, version=1))
+        db.commit()
+        return 1
+    except IntegrityError:  # another process created it first
+        db.rollback()
+        return bump_version(db, name)
+
+
+def user_version_name(user_id) -> str:
+    """The version counter of one user's cached responses, bumped when their own data changes."""
+    return f"user:{user_id}"
+
+
+class MemoryBackend:
+    """In-process LRU with per-entry expiry."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, tuple[bytes, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: str, value: bytes, ttl_seconds: float):
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisBackend:
+    """Shared cache for several API processes, e.g. CACHE_URL=redis://localhost:6379/0."""
+
+    def __init__(self, url: str):
+        if redis is None:
+            raise RuntimeError("CACHE_URL is set but the redis package is not installed")
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> bytes | None:
+        return self._client.get(f"hackplate:{key}")
+
+    def set(self, key: str, value: bytes, ttl_seconds: float):
+        self._client.set(f"hackplate:{key}", value, ex=max(int(ttl_seconds), 1))
+
+    def clear(self):
+        for key in self._client.scan_iter("hackplate:*"):
+            self._client.delete(key)
+
+
+class PolledVersion:
+    """A version counter, re-read from the DB at most every poll_seconds."""
+
+    def __init__(self, name: str, poll_seconds: float):
+        self.name = name
+        self.poll_seconds = poll_seconds
+        self._version: int | None = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, db: Session) -> int:
+        with self._lock:
+            if self._version is not None and time.monotonic() - self._checked_at < self.poll_seconds:
+                return self._version
+        version = data_version(db, self.name)
+        with self._lock:
+            self._version, self._checked_at = version, time.monotonic()
+        return version
+
+    def reset(self):
+        with self._lock:
+            self._version = None
+
+
+class ResponseCache:
+    """
+    Cache-aside for read endpoints whose data only changes when events are written.
+
+    Entries are keyed on the endpoint, the normalized query parameters and a data
+    version kept in the cache_versions table. Writers call bump() after they
+    commit, so every process moves to new keys (other processes within
+    CACHE_VERSION_POLL_SECONDS) and stale entries age out. Responses that depend
+    on who asks are also keyed on that user's own version, which bump_user()
+    moves without touching anyone else's entries. Responses carry an ETag; a
+    matching If-None-Match gets an empty 304.
+    """
+
+    def __init__(self, backend, ttl_seconds: float = 300, version_poll_seconds: float = 2):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.version_poll_seconds = version_poll_seconds
+        self._version = PolledVersion(VERSION_NAME, version_poll_seconds)
+        self._user_versions: OrderedDict[str, PolledVersion] = OrderedDict()  # LRU, capped like the memory backend
+        self._lock = threading.Lock()
+
+    def version(self, db: Session) -> int:
+        """Current data version; re-read from the DB at most every version_poll_seconds."""
+        return self._version.get(db)
+
+    def bump(self, db: Session) -> int:
+        """Invalidate every cached response. Call after the data change has committed. Returns the new version."""
+        version = bump_version(db)
+        self._version.reset()
+        return version
+
+    def bump_user(self, db: Session, user_id) -> int:
+        """Invalidate one user's cached responses. Call after the change has committed. Returns the new version."""
+        version = bump_version(db, user_version_name(user_id))
+        self._user_version(user_id).reset()
+        return version
+
+    def _user_version(self, user_id) -> PolledVersion:
+        name = user_version_name(user_id)
+        with self._lock:
+            polled = self._user_versions.get(name)
+            if polled is None:
+                polled = self._user_versions[name] = PolledVersion(name, self.version_poll_seconds)
+                while len(self._user_versions) > settings.CACHE_MAX_ENTRIES:
+                    self._user_versions.popitem(last=False)
+            self._user_versions.move_to_end(name)
+            return polled
+
+    def key(self, namespace: str, version: int | str, params: dict[str, Any]) -> str:
+        query = urlencode(sorted((k, str(v)) for k, v in params.items() if v is not None))
+        return f"{namespace}:v{version}:{query}"
+
+    def respond(
+        self,
+        request: Request,
+        db: Session,
+        namespace: str,
+        params: dict[str, Any],
+        compute: Callable[[], Any],
+        headers: Callable[[Any], dict[str, str]] | None = None,
+        user_id=None,
+    ) -> Response:
+        """
+        The cached JSON for (namespace, params), computing and storing it on a miss.
+        headers derives extra response headers from the computed value; they are cached with it.
+        Pass user_id when the response depends on that user's data (see bump_user).
+        """
+        version = self.version(db)
+        if user_id is not None:
+            version = f"{version}.{self._user_version(user_id).get(db)}"
+        key = self.key(namespace, version, params)
+        entry = self.backend.get(key)
+        if entry is not None:
+            meta, body = entry.split(b"\n", 1)
+            meta = json.loads(meta)
+        else:
+            value = compute()
+            body = json.dumps(jsonable_encoder(value), separators=(",", ":")).encode("utf-8")
+            meta = {
+                "etag": f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+                "headers": headers(value) if headers else {},
+            }
+            self.backend.set(key, json.dumps(meta).encode("utf-8") + b"\n" + body, self.ttl_seconds)
+
+        # no-cache: clients may keep the body but must revalidate -- which the 304 makes cheap
+        response_headers = {**meta["headers"], "ETag": meta["etag"], "Cache-Control": "private, no-cache"}
+        if _etag_matches(request.headers.get("if-none-match"), meta["etag"]):
+            return Response(status_code=304, headers=response_headers)
+        return Response(content=body, media_type="application/json", headers=response_headers)
+
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def _backend():
+    if settings.CACHE_URL:
+        return RedisBackend(settings.CACHE_URL)
+    return MemoryBackend(settings.CACHE_MAX_ENTRIES)
+
+
+response_cache = ResponseCache(_backend(), settings.CACHE_TTL_SECONDS, settings.CACHE_VERSION_POLL_SECONDS)
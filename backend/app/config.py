@@ -13,6 +13,7 @@ class Settings(BaseSettings):
     # Telegram
     TELEGRAM_BOT_TOKEN: str = ""
     TELEGRAM_CHAT_ID: str = ""
+    TELEGRAM_API_URL: str = "https://api.telegram.org"
 
     # Email (SMTP)
     SMTP_HOST: str = ""
@@ -20,12 +21,51 @@ class Settings(BaseSettings):
     SMTP_USER: str = ""
     SMTP_PASSWORD: str = ""
     SMTP_FROM: str = ""
+    SMTP_STARTTLS: bool = True
+
+    # Notification dispatcher (outbox)
+    NOTIFY_BATCH_SIZE: int = 50  # messages claimed per channel per round; one SMTP session per batch
+    NOTIFY_MAX_ATTEMPTS: int = 6
+    NOTIFY_RETRY_BASE_SECONDS: int = 30  # doubles per attempt
+    NOTIFY_POLL_SECONDS: int = 10  # idle workers re-check the outbox this often
+    TELEGRAM_CONCURRENCY: int = 5  # messages in flight on the pooled Telegram client
+    DIGEST_FLUSH_SECONDS: int = 300  # how often due daily / weekly digests are sent
+    SUBSCRIPTION_INDEX_REFRESH_SECONDS: int = 300  # picks up rules / saved searches from other processes
 
     # Geocoding
     NOMINATIM_USER_AGENT: str = "hackplate-ai/3.0"
+    GEOCODE_CACHE_PATH: str = "./geocode_cache.db"
+    GEOCODE_CACHE_SIZE: int = 4096  # in-process LRU entries in front of the cache file
+    GEOCODE_TTL_DAYS: int = 90
+    GEOCODE_NEGATIVE_TTL_HOURS: int = 24  # places that didn't resolve are retried after this
+    GAZETTEER_PATH: str = "./gazetteer.bin"  # built from GAZETTEER_SOURCE on first lookup
+    GAZETTEER_SOURCE: str = ""  # GeoNames-format TSV; empty = the bundled subset
+    SPATIAL_INDEX_REFRESH_SECONDS: int = 300  # 0 = build once at startup
+
+    # Response cache
+    CACHE_URL: str = ""  # empty = in-process LRU; redis://... shares it between processes
+    CACHE_TTL_SECONDS: int = 300
+    CACHE_MAX_ENTRIES: int = 1024
+    CACHE_VERSION_POLL_SECONDS: float = 2  # how soon other processes' invalidations are seen
 
     # Scraping
     SCRAPE_LIMIT: int = 10
+    SCRAPE_CONCURRENCY: int = 4  # detail pages in flight per source
+    SCRAPE_TIMEOUT_SECONDS: int = 300  # per-source budget for one ingestion run
+    HTTP_CACHE_PATH: str = "./http_cache.db"  # conditional-GET cache for scraper fetches
+    INGEST_WORKERS: int = 2  # job worker threads per API process; >1 so a slow source can't block the rest
+    INGEST_POLL_SECONDS: int = 5  # how often idle workers look for jobs queued by other processes
+    INGEST_HEARTBEAT_SECONDS: int = 30  # running jobs silent for 4x this are marked failed
+    SCHEDULER_ENABLED: bool = True  # periodic per-source ingestion; one process leads via a DB lease
+    SCHEDULER_TICK_SECONDS: int = 15
+    SCHEDULE_INTERVALS: dict[str, int] = {}  # source -> seconds, e.g. '{"unstop": 1800}'
+    SCHEDULE_MAX_BACKOFF_SECONDS: int = 86400  # cap on the doubling delay after failed runs
+
+    # Text analysis
+    ANALYSIS_WORKERS: int = 0  # process pool size for large batches; 0 = one per CPU
+    ANALYSIS_PARALLEL_MIN_BATCH: int = 2000  # smaller batches are analyzed in-process
+    ANALYSIS_CHUNK_SIZE: int = 250  # events per pool task
+    RESCORE_CHUNK_SIZE: int = 2000  # rows read, analyzed and written back per rescore step
 
     class Config:
         env_file = (".env", "../.env")
@@ -1,4 +1,8 @@
-from sqlalchemy import create_engine
+import warnings
+
+from sqlalchemy import Column, create_engine, inspect, text
+from sqlalchemy.exc import SAWarning
+from sqlalchemy.schema import CreateIndex
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from .config import get_settings
 
@@ -17,6 +21,25 @@ class Base(DeclarativeBase):
     pass
 
 
+def upsert_insert(db, table):
+    """
+    An INSERT for table with .on_conflict_do_update() / .on_conflict_do_nothing().
+
+    Ingestion writes, the analytics rollups and digest queueing are all built on
+    this, so they run only on PostgreSQL and SQLite (the two databases the app is
+    deployed on). Any other dialect raises NotImplementedError on first write --
+    unlike the original row-at-a-time ingestion, which ran on anything SQLAlchemy did.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"INSERT ... ON CONFLICT is not supported on {dialect}")
+    return insert(table)
+
+
 def get_db():
     """FastAPI dependency — yields a DB session."""
     db = SessionLocal()
@@ -27,6 +50,43 @@ def get_db():
 
 
 def init_db():
-    """Create all tables."""
+    """Create all tables, and add nullable columns and indexes introduced since a table was created."""
     from . import models  # noqa: F401
     Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
+    _add_missing_indexes()
+
+
+def _add_missing_columns():
+    """create_all() never alters existing tables; add any new nullable columns in place."""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            present = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in present or not column.nullable:
+                    continue
+                col_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}'))
+                print(f"  [db] Added column {table.name}.{column.name}")
+
+
+def _add_missing_indexes():
+    """create_all() never indexes existing tables either; create any declared index that's missing."""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", SAWarning)  # SQLite can't reflect expression indexes
+                present = {i["name"] for i in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name in present:
+                    continue
+                # IF NOT EXISTS: an expression index never shows up as present on SQLite
+                conn.execute(CreateIndex(index, if_not_exists=True))
+                if all(isinstance(expr, Column) for expr in index.expressions):
+                    print(f"  [db] Added index {index.name}")
@@ -1,17 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+import json
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 from uuid import UUID
 from .. import models, schemas
-from ..database import get_db
+from ..database import SessionLocal, get_db
 from ..auth.utils import get_current_user
-from .service import search_events
+from ..cache import response_cache
+from .service import (
+    SORT_COLUMNS, export_events, next_cursor, ordered, resolve_fields, search_events, seek,
+)
 
 router = APIRouter(prefix="/events", tags=["events"])
 
+SORT_PATTERN = f"^({'|'.join(SORT_COLUMNS)})$"
+VIEW_PATTERN = "^(full|summary)$"
+
 
 @router.get("/", response_model=list[schemas.EventResponse])
 def list_events(
+    request: Request,
     location: str | None = None,
     radius_km: int = 50,
     min_score: int = 0,
@@ -20,12 +30,70 @@ def list_events(
     food_only: bool = False,
     page: int = 1,
     per_page: int = 20,
+    sort: str = Query("relevance", pattern=SORT_PATTERN),
+    cursor: str | None = None,
+    fields: str | None = None,
+    view: str = Query("full", pattern=VIEW_PATTERN),
     db: Session = Depends(get_db),
     user: models.User | None = Depends(get_current_user),
 ):
-    """Search events with filters. If authenticated, user preferences are applied automatically."""
-    return search_events(db, location, radius_km, min_score, source,
-                         event_type, food_only, page, per_page, user_id=user.id if user else None)
+    """
+    Search events with filters. If authenticated, user preferences are applied automatically.
+    A full page sets X-Next-Cursor; pass it back as ?cursor= for the next page (page is then ignored).
+    ?view=summary or ?fields=title,url,... returns only those keys, read straight from the columns.
+    """
+    user_id = user.id if user else None
+    columns = _columns(fields, view, sort)
+    params = {
+        "location": location, "radius_km": radius_km, "min_score": min_score, "source": source,
+        "event_type": event_type, "food_only": food_only, "page": page, "per_page": per_page,
+        "sort": sort, "cursor": cursor, "fields": ",".join(columns) if columns else None, "user": user_id,
+    }
+
+    def compute():
+        try:
+            events = search_events(db, location, radius_km, min_score, source, event_type, food_only,
+                                   page, per_page, user_id=user_id, sort=sort, cursor=cursor, fields=columns)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if columns:
+            return events
+        return [schemas.EventResponse.model_validate(e) for e in events]
+
+    return response_cache.respond(request, db, "events", params, compute,
+                                  headers=lambda events: _cursor_header(events, sort, per_page), user_id=user_id)
+
+
+@router.get("/export")
+def export(
+    location: str | None = None,
+    radius_km: int = 50,
+    min_score: int = 0,
+    source: str | None = None,
+    event_type: str | None = None,
+    food_only: bool = False,
+    sort: str = Query("relevance", pattern=SORT_PATTERN),
+    fields: str | None = None,
+    view: str = Query("full", pattern=VIEW_PATTERN),
+    format: str = Query("ndjson", pattern="^(ndjson|json)$"),
+    user: models.User | None = Depends(get_current_user),
+):
+    """
+    Every matching event, streamed as NDJSON (one object per line) or a single JSON array.
+    Same filters, fields and view as the search; rows are read and sent in batches.
+    """
+    user_id = user.id if user else None
+    columns = _columns(fields, view, sort) or list(schemas.EventResponse.model_fields)
+
+    def batches():
+        # Own session: the stream outlives the request's dependencies
+        with SessionLocal() as db:
+            yield from export_events(db, columns, location, radius_km, min_score, source,
+                                     event_type, food_only, user_id=user_id, sort=sort)
+
+    if format == "ndjson":
+        return StreamingResponse(_ndjson(batches()), media_type="application/x-ndjson")
+    return StreamingResponse(_json_array(batches()), media_type="application/json")
 
 
 @router.get("/{event_id}", response_model=schemas.EventResponse)
@@ -82,14 +150,64 @@ def unsave_event(
 
 @router.get("/saved/list", response_model=list[schemas.EventResponse])
 def get_saved_events(
+    response: Response,
+    per_page: int | None = Query(None, ge=1),
+    sort: str = Query("relevance", pattern=SORT_PATTERN),
+    cursor: str | None = None,
     db: Session = Depends(get_db),
     user: models.User = Depends(get_current_user),
 ):
+    """The user's saved events, best first. Without per_page, all of them; with it, cursor-paginated like /events."""
     if not user:
         raise HTTPException(status_code=401, detail="Unauthorized")
-    saved = db.query(models.SavedEvent).filter(
-        models.SavedEvent.user_id == user.id
-    ).all()
-    event_ids = [s.event_id for s in saved]
-    events = db.query(models.Event).filter(models.Event.id.in_(event_ids)).all()
+    query = ordered(
+        db.query(models.Event)
+        .join(models.SavedEvent, models.SavedEvent.event_id == models.Event.id)
+        .filter(models.SavedEvent.user_id == user.id),
+        sort,
+    )
+    if cursor:
+        try:
+            query = seek(query, sort, cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    if per_page is None:
+        return query.all()
+    events = query.limit(per_page).all()
+    response.headers.update(_cursor_header(events, sort, per_page))
     return events
+
+
+def _cursor_header(events: list, sort: str, per_page: int) -> dict[str, str]:
+    token = next_cursor(events, sort, per_page)
+    return {"X-Next-Cursor": token} if token else {}
+
+
+def _columns(fields: str | None, view: str, sort: str) -> list[str] | None:
+    try:
+        return resolve_fields(fields, view, sort)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _ndjson(batches):
+    for batch in batches:
+        yield "".join(json.dumps(row, default=_json_default) + "\n" for row in batch)
+
+
+def _json_array(batches):
+    yield "["
+    first = True
+    for batch in batches:
+        chunk = ",".join(json.dumps(row, default=_json_default) for row in batch)
+        yield chunk if first else "," + chunk
+        first = False
+    yield "]"
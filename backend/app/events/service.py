@@ -1,10 +1,36 @@
-from sqlalchemy.orm import Session
-from .. import models
-from ..intelligence.geo import geocode, haversine
+import base64
+import json
+from itertools import islice
+from typing import Iterator
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session, Query
+from .. import models, schemas
+from ..intelligence.geo import geocode, haversine_many, bounding_box
+from ..intelligence.spatial import event_index
 
 
 from uuid import UUID
 
+# ?sort= values -> score column; id breaks ties in both
+SORT_COLUMNS = {
+    "relevance": models.Event.relevance_score,
+    "total": models.Event.total_score,
+}
+
+# Rows fetched per SQL window when walking a geo-filtered result set
+GEO_SCAN_CHUNK = 200
+# Largest spatial-index hit list pushed into SQL as an id IN (...) filter
+INDEX_ID_LIMIT = 500
+# Rows per SQL window (and per streamed chunk) when exporting
+EXPORT_CHUNK = 1000
+
+# ?view=summary -- what an event card shows; no description, keywords or coordinates
+SUMMARY_FIELDS = (
+    "id", "title", "url", "city", "event_type", "start_date",
+    "food_score", "relevance_score", "total_score",
+)
+
+
 def search_events(
     db: Session,
     location: str | None = None,
@@ -16,25 +42,129 @@ def search_events(
     page: int = 1,
     per_page: int = 20,
     user_id: UUID | None = None,
-) -> list[models.Event]:
+    sort: str = "relevance",
+    cursor: str | None = None,
+    fields: list[str] | None = None,
+) -> list[models.Event] | list[dict]:
     """
     Search events with optional geo-radius filter, scoring threshold, and pagination.
     If a user_id is provided, their primary SavedSearch implicitly overrides the defaults.
+
+    Pass a cursor (see next_cursor) to seek past the previous page in SQL instead
+    of skipping page * per_page rows; page is ignored then. Raises ValueError for
+    a malformed cursor.
+
+    With fields (see resolve_fields), only those columns are selected and plain
+    dicts come back instead of Event objects.
+    """
+    query, center_lat, center_lon, radius_km = _filtered(
+        db, location, radius_km, min_score, source, event_type, food_only, user_id, sort, fields,
+    )
+    start = max(page - 1, 0) * per_page
+    if cursor:
+        query = seek(query, sort, cursor)
+        start = 0
+
+    if center_lat is None or center_lon is None:
+        return _as_dicts(query.offset(start).limit(per_page).all(), fields)
+
+    # Geo filter, small result: the in-memory spatial index yields the exact id set --
+    # but only once it has caught up with writes made by other processes
+    if event_index.current(db):
+        hits = event_index.within_radius(center_lat, center_lon, radius_km)
+        if len(hits) <= INDEX_ID_LIMIT:
+            if not hits:
+                return []
+            ids = [event_id for event_id, _ in hits]
+            return _as_dicts(query.filter(models.Event.id.in_(ids)).offset(start).limit(per_page).all(), fields)
+
+    # Geo filter: indexed bounding-box prefilter in SQL, exact haversine on the survivors
+    query = _within_box(query, center_lat, center_lon, radius_km)
+    matches = _within_radius(query, sort, center_lat, center_lon, radius_km, max(per_page * 2, GEO_SCAN_CHUNK))
+    return _as_dicts(list(islice(matches, start, start + per_page)), fields)
+
+
+def export_events(
+    db: Session,
+    fields: list[str],
+    location: str | None = None,
+    radius_km: int = 50,
+    min_score: int = 0,
+    source: str | None = None,
+    event_type: str | None = None,
+    food_only: bool = False,
+    user_id: UUID | None = None,
+    sort: str = "relevance",
+) -> Iterator[list[dict]]:
+    """
+    Every event matching the search filters, as batches of field dicts in result order.
+    Walks the table in EXPORT_CHUNK keyset windows, so memory stays flat however many rows match.
     """
-    
-    # If user context passed, try to apply their saved search
-    if user_id and not location:
+    query, center_lat, center_lon, radius_km = _filtered(
+        db, location, radius_km, min_score, source, event_type, food_only, user_id, sort, fields,
+    )
+    if center_lat is None or center_lon is None:
+        for window in _windows(query, sort, EXPORT_CHUNK):
+            yield _as_dicts(window, fields)
+        return
+
+    query = _within_box(query, center_lat, center_lon, radius_km)
+    matches = _within_radius(query, sort, center_lat, center_lon, radius_km, EXPORT_CHUNK)
+    while batch := list(islice(matches, EXPORT_CHUNK)):
+        yield _as_dicts(batch, fields)
+
+
+def resolve_fields(fields: str | None, view: str, sort: str) -> list[str] | None:
+    """
+    Columns for ?fields=a,b / ?view=summary, or None for full Event rows. id and
+    the sort score are always included so a page can be continued.
+    Raises ValueError for a field EventResponse doesn't have.
+    """
+    if fields:
+        names = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in names if name not in schemas.EventResponse.model_fields]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    elif view == "summary":
+        names = list(SUMMARY_FIELDS)
+    else:
+        return None
+    return list(dict.fromkeys(["id", *names, SORT_COLUMNS[sort].key]))
+
+
+def _filtered(
+    db: Session,
+    location: str | None,
+    radius_km: int,
+    min_score: int,
+    source: str | None,
+    event_type: str | None,
+    food_only: bool,
+    user_id: UUID | None,
+    sort: str,
+    fields: list[str] | None,
+) -> tuple[Query, float | None, float | None, float]:
+    """The filtered, ordered query plus the search centre and radius (a saved search may set them)."""
+    center_lat, center_lon = None, None
+
+    if location:
+        center_lat, center_lon = geocode(location)
+    elif user_id:
+        # If user context passed, try to apply their saved search (direct lat/lon, no geocoding)
         saved = db.query(models.SavedSearch).filter(models.SavedSearch.user_id == user_id).first()
         if saved:
-            # We skip location text geo-coding and just filter by direct lat/lon later
             radius_km = saved.radius_km
             min_score = saved.min_score
-            food_only = saved.food_required 
-            # Inject a custom attribute to signal direct lat/lon filtering
-            setattr(search_events, "direct_lat", saved.latitude)
-            setattr(search_events, "direct_lon", saved.longitude)
+            food_only = saved.food_required
+            center_lat, center_lon = saved.latitude, saved.longitude
 
-    query = db.query(models.Event)
+    if fields is None:
+        query = db.query(models.Event)
+    else:
+        # Bare columns: rows come back as tuples, no ORM identity map or attribute instrumentation.
+        # lat/lon ride along (past the requested fields) for the radius check.
+        extra = ["lat", "lon"] if center_lat is not None and center_lon is not None else []
+        query = db.query(*(getattr(models.Event, name) for name in dict.fromkeys([*fields, *extra])))
 
     # Basic strict filters
     if source:
@@ -46,29 +176,98 @@ def search_events(
     if min_score > 0:
         query = query.filter(models.Event.relevance_score >= min_score)
 
-    # Get all matching events first
-    events = query.order_by(models.Event.relevance_score.desc()).all()
-
-    # Apply geo filter if location provided or SavedSearch lat/lon was extracted
-    direct_lat = getattr(search_events, "direct_lat", None)
-    direct_lon = getattr(search_events, "direct_lon", None)
-
-    if direct_lat and direct_lon:
-        events = [
-            e for e in events
-            if e.lat and e.lon and haversine(direct_lat, direct_lon, e.lat, e.lon) <= radius_km
-        ]
-        # Clear the hacky attribute
-        delattr(search_events, "direct_lat")
-        delattr(search_events, "direct_lon")
-    elif location:
-        center_lat, center_lon = geocode(location)
-        if center_lat and center_lon:
-            events = [
-                e for e in events
-                if e.lat and e.lon and haversine(center_lat, center_lon, e.lat, e.lon) <= radius_km
-            ]
-
-    # Pagination
-    start = (page - 1) * per_page
-    return events[start:start + per_page]
+    return ordered(query, sort), center_lat, center_lon, radius_km
+
+
+def _as_dicts(rows: list, fields: list[str] | None) -> list:
+    if fields is None:
+        return rows
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def ordered(query: Query, sort: str) -> Query:
+    """Score descending, then id -- the order cursors seek through."""
+    return query.order_by(sort_key(sort).desc(), models.Event.id)
+
+
+def sort_key(sort: str):
+    """
+    The score expression ORDER BY and seek use. Rows from before a score column
+    was added hold NULL, which would never satisfy the seek; they rank as 0.
+    Matches the ix_events_*_sort expression indexes.
+    """
+    return func.coalesce(SORT_COLUMNS[sort], 0)
+
+
+def _score(row, sort: str) -> int:
+    key = SORT_COLUMNS[sort].key
+    return (row[key] if isinstance(row, dict) else getattr(row, key)) or 0
+
+
+def next_cursor(events: list, sort: str, per_page: int) -> str | None:
+    """Opaque token for the page after `events`; None when this page wasn't full."""
+    if not events or len(events) < per_page:
+        return None
+    last = events[-1]
+    last_id = last["id"] if isinstance(last, dict) else last.id
+    payload = {"s": sort, "v": _score(last, sort), "id": str(last_id)}
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> tuple[int, UUID]:
+    """(score, id) of the last row of the previous page. ValueError if the token is bad or from another sort."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if payload["s"] != sort:
+            raise ValueError("cursor belongs to a different sort")
+        return int(payload["v"]), UUID(payload["id"])
+    except (KeyError, TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {e}") from None
+
+
+def seek(query: Query, sort: str, cursor: str) -> Query:
+    """Rows strictly after the cursor in (score desc, id) order, as an indexable WHERE clause."""
+    score, last_id = decode_cursor(cursor, sort)
+    return query.filter(_after(sort, score, last_id))
+
+
+def _after(sort: str, score: int, last_id: UUID):
+    key = sort_key(sort)
+    return or_(key < score, and_(key == score, models.Event.id > last_id))
+
+
+def _within_box(query: Query, lat: float, lon: float, radius_km: float) -> Query:
+    min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+    query = query.filter(models.Event.lat.between(min_lat, max_lat))
+    if min_lon is not None:
+        return query.filter(models.Event.lon.between(min_lon, max_lon))
+    return query.filter(models.Event.lon.isnot(None))
+
+
+def _windows(query: Query, sort: str, chunk: int) -> Iterator[list]:
+    """
+    An ordered query in `chunk`-row SQL windows. Each window seeks past the last
+    row of the previous one rather than using OFFSET.
+    """
+    window_query = query
+    while True:
+        window = window_query.limit(chunk).all()
+        if window:
+            yield window
+        if len(window) < chunk:
+            return
+        last = window[-1]
+        window_query = query.filter(_after(sort, _score(last, sort), last.id))
+
+
+def _within_radius(query: Query, sort: str, lat: float, lon: float, radius_km: float, chunk: int) -> Iterator:
+    """
+    Rows of a box-filtered query that fall inside the exact radius, in order,
+    fetched lazily window by window. Box corners outside the circle are the only
+    rows fetched and discarded.
+    """
+    for window in _windows(query, sort, chunk):
+        distances = haversine_many(lat, lon, [e.lat for e in window], [e.lon for e in window])
+        for e, dist in zip(window, distances):
+            if dist <= radius_km:
+                yield e
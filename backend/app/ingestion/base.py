@@ -1,5 +1,18 @@
+import asyncio
+import hashlib
+import importlib.util
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from typing import Awaitable, Callable
+from urllib.parse import urlsplit
+
+import httpx
+
+from ..config import get_settings
+from .http_cache import http_cache, NOT_MODIFIED, UNCHANGED, CHANGED
+
+settings = get_settings()
 
 
 @dataclass
@@ -12,11 +25,151 @@ class RawEvent:
     start_date: str | None
     source: str
 
+    def content_hash(self) -> str:
+        """Fingerprint of everything that feeds the stored row."""
+        parts = (self.title, self.description[:5000], self.location_text, self.start_date or "", self.source)
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
 
 class BaseScraper(ABC):
     """Interface for all scrapers."""
 
+    name: str = "unknown"  # source key, matches RawEvent.source
+    schedule_interval: int = 3600  # seconds between scheduled runs (SCHEDULE_INTERVALS overrides)
+    schedule_jitter: float = 0.1  # +- fraction of the interval, spreads runs out
+
+    @property
+    def max_concurrency(self) -> int:
+        """Detail pages fetched at once for this source."""
+        return settings.SCRAPE_CONCURRENCY
+
     @abstractmethod
     def scrape(self, limit: int = 10) -> list[RawEvent]:
         """Scrape events and return normalized list."""
         pass
+
+    def fetch_concurrently(self, urls: list[str], extract: Callable[[str], RawEvent | None]) -> list[RawEvent]:
+        """Run extract over urls with at most max_concurrency in flight. Keeps input order, drops failures."""
+        with ThreadPoolExecutor(max_workers=max(1, self.max_concurrency), thread_name_prefix=self.name) as pool:
+            return [event for event in pool.map(extract, urls) if event]
+
+
+class HTTPPool:
+    """
+    One pooled httpx.AsyncClient for a scrape run: keep-alive connections shared per
+    host, HTTP/2 when `h2` is installed, bounded connection count, retries with
+    exponential backoff, a minimum interval between requests to the same host, and
+    conditional GETs through the persistent HTTP cache.
+    """
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        headers: dict[str, str],
+        source: str = "unknown",
+        timeout: float = 15,
+        max_connections: int = 10,
+        max_retries: int = 3,
+        backoff_seconds: float = 0.5,
+        host_interval: float = 0.2,
+    ):
+        self.client = httpx.AsyncClient(
+            headers=headers,
+            timeout=timeout,
+            follow_redirects=True,
+            http2=importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+        self.source = source
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.host_interval = host_interval
+        self._host_locks: dict[str, asyncio.Lock] = {}
+        self._host_next: dict[str, float] = {}
+
+    async def __aenter__(self) -> "HTTPPool":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.client.aclose()
+
+    async def _pace(self, host: str):
+        """Space out request starts to one host by host_interval."""
+        lock = self._host_locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            loop = asyncio.get_running_loop()
+            delay = self._host_next.get(host, 0.0) - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._host_next[host] = loop.time() + self.host_interval
+
+    async def get(self, url: str, headers: dict[str, str] | None = None) -> httpx.Response:
+        """GET with per-host pacing and retries on transport errors / 429 / 5xx."""
+        host = urlsplit(url).netloc
+        for attempt in range(self.max_retries + 1):
+            await self._pace(host)
+            try:
+                resp = await self.client.get(url, headers=headers)
+            except httpx.TransportError:
+                if attempt == self.max_retries:
+                    raise
+            else:
+                if resp.status_code not in self.RETRY_STATUSES or attempt == self.max_retries:
+                    if resp.status_code >= 400:  # 304 is a valid answer to a conditional GET
+                        resp.raise_for_status()
+                    return resp
+            await asyncio.sleep(self.backoff_seconds * 2 ** attempt)
+
+    async def get_text(self, url: str) -> str:
+        return (await self.get(url)).text
+
+    async def fetch(self, url: str, confirm: bool = False) -> tuple[str, bool]:
+        """
+        Conditional GET through the HTTP cache. Returns (body, changed): on a 304 the
+        body comes from the cache, and changed is False for a 304 or an identical body.
+        confirm=True trusts the entry right away (pages that don't become events).
+        """
+        entry = http_cache.get(url)
+        resp = await self.get(url, headers=http_cache.validators(entry))
+        if resp.status_code == 304 and entry is not None:
+            http_cache.record(self.source, NOT_MODIFIED)
+            return entry.body, False
+
+        changed = http_cache.store(
+            url, resp.text, resp.headers.get("etag"), resp.headers.get("last-modified"), confirmed=confirm,
+        )
+        http_cache.record(self.source, CHANGED if changed else UNCHANGED)
+        return resp.text, changed
+
+
+class AsyncHTTPScraper(BaseScraper):
+    """
+    Base for scrapers that fetch plain HTTP pages. scrape() is a coroutine that opens
+    one HTTPPool for the run and hands it to collect(); the runner drives it on its
+    own event loop.
+    """
+
+    HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
+
+    async def scrape(self, limit: int = 10) -> list[RawEvent]:
+        async with HTTPPool(self.HEADERS, source=self.name, max_connections=self.max_concurrency) as http:
+            return await self.collect(http, limit)
+
+    @abstractmethod
+    async def collect(self, http: HTTPPool, limit: int) -> list[RawEvent]:
+        """Fetch and parse events using the run's pooled client."""
+        pass
+
+    async def gather_limited(
+        self, urls: list[str], extract: Callable[[str], Awaitable[RawEvent | None]],
+    ) -> list[RawEvent]:
+        """Async fetch_concurrently: at most max_concurrency extracts in flight, input order kept."""
+        sem = asyncio.Semaphore(max(1, self.max_concurrency))
+
+        async def _bounded(url: str):
+            async with sem:
+                return await extract(url)
+
+        results = await asyncio.gather(*(_bounded(url) for url in urls))
+        return [event for event in results if event]
@@ -0,0 +1,99 @@
+import asyncio
+import threading
+from typing import Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+# Resource types that never affect the text we parse
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+
+
+class BrowserPool:
+    """
+    One long-lived headless Chromium shared by every ingestion run.
+
+    Playwright's async objects are bound to the event loop that created them, so the
+    pool owns a dedicated loop thread; callers on any thread hand it coroutines via
+    run(). Each run gets its own browser context (cheap) instead of a new browser.
+    """
+
+    def __init__(self):
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._playwright = None
+        self._browser = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None and self._loop.is_running()
+
+    def start(self):
+        """Start the loop thread and launch Chromium. No-op if already running."""
+        with self._lock:
+            if self.running:
+                return
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="browser-pool", daemon=True)
+            thread.start()
+            try:
+                asyncio.run_coroutine_threadsafe(self._launch(), loop).result()
+            except Exception:
+                asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result()
+                loop.call_soon_threadsafe(loop.stop)
+                thread.join()
+                loop.close()
+                raise
+            self._loop, self._thread = loop, thread
+            print("  [browser] Chromium pool started")
+
+    def stop(self):
+        with self._lock:
+            if not self.running:
+                return
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop, self._thread = None, None
+            print("  [browser] Chromium pool stopped")
+
+    def run(self, coro_factory: Callable[[], Awaitable[T]], timeout: float | None = None) -> T:
+        """Run a coroutine on the pool's loop from any thread, starting the pool on first use."""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro_factory(), self._loop).result(timeout)
+
+    async def new_context(self, **kwargs):
+        """Fresh browser context with images, fonts and media blocked. Relaunches a crashed browser."""
+        if self._browser is None or not self._browser.is_connected():
+            await self._shutdown()
+            await self._launch()
+        context = await self._browser.new_context(**kwargs)
+        await context.route("**/*", _block_heavy_resources)
+        return context
+
+    async def _launch(self):
+        from playwright.async_api import async_playwright
+
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(headless=True)
+
+    async def _shutdown(self):
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+        if self._playwright is not None:
+            await self._playwright.stop()
+        self._browser, self._playwright = None, None
+
+
+async def _block_heavy_resources(route):
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+browser_pool = BrowserPool()
@@ -1,43 +1,55 @@
-from playwright.sync_api import sync_playwright
+import asyncio
 from bs4 import BeautifulSoup
-import time
 from .base import BaseScraper, RawEvent
+from .browser import browser_pool
+from .http_cache import http_cache, UNCHANGED, CHANGED
 
 
 class DevfolioScraper(BaseScraper):
+    name = "devfolio"
+    schedule_interval = 3 * 3600  # a browser run is expensive; Devfolio listings move slowly
     BASE_URL = "https://devfolio.co/hackathons"
+    LINK_SELECTOR = "a[href*='.devfolio.co']"
+    USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                  "AppleWebKit/537.36 (KHTML, like Gecko) "
+                  "Chrome/119.0.0.0 Safari/537.36")
+    DETAIL_READY_SELECTOR = "h1"
+    DOM_TIMEOUT_MS = 15_000
 
     def scrape(self, limit: int = 10) -> list[RawEvent]:
-        results = []
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            context = browser.new_context(
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                           "AppleWebKit/537.36 (KHTML, like Gecko) "
-                           "Chrome/119.0.0.0 Safari/537.36"
-            )
-            page = context.new_page()
+        # Runs on the shared browser pool's loop; this thread just waits for the result
+        return browser_pool.run(lambda: self._scrape(limit))
 
-            # Get hackathon links
-            links = self._get_links(page)
+    async def _scrape(self, limit: int) -> list[RawEvent]:
+        context = await browser_pool.new_context(user_agent=self.USER_AGENT)
+        try:
+            page = await context.new_page()
+            links = await self._get_links(page)
+            await page.close()
             print(f"  [devfolio] Found {len(links)} hackathons. Scraping top {min(limit, len(links))}...")
+            return await self._extract_all(context, links[:limit])
+        finally:
+            await context.close()
 
-            for url in links[:limit]:
-                event = self._extract(page, url)
-                if event:
-                    results.append(event)
-
-            browser.close()
-        return results
-
-    def _get_links(self, page) -> list[str]:
+    async def _get_links(self, page) -> list[str]:
         print(f"  [devfolio] Navigating to {self.BASE_URL}...")
-        page.goto(self.BASE_URL, wait_until="networkidle")
-        page.evaluate("window.scrollTo(0, document.body.scrollHeight/2)")
-        time.sleep(2)
+        await page.goto(self.BASE_URL, wait_until="domcontentloaded")
+        await page.wait_for_selector(self.LINK_SELECTOR, timeout=self.DOM_TIMEOUT_MS)
+
+        # Scrolling lazy-loads more cards; wait until new links render rather than a fixed sleep
+        count = await page.eval_on_selector_all(self.LINK_SELECTOR, "elements => elements.length")
+        await page.evaluate("window.scrollTo(0, document.body.scrollHeight/2)")
+        try:
+            await page.wait_for_function(
+                "([sel, n]) => document.querySelectorAll(sel).length > n",
+                arg=[self.LINK_SELECTOR, count],
+                timeout=3_000,
+            )
+        except Exception:
+            pass  # nothing more to lazy-load
 
-        hrefs = page.eval_on_selector_all(
-            "a[href*='.devfolio.co']",
+        hrefs = await page.eval_on_selector_all(
+            self.LINK_SELECTOR,
             "elements => elements.map(e => e.href)"
         )
 
@@ -50,31 +62,64 @@ class DevfolioScraper(BaseScraper):
                         unique.append(link)
         return unique
 
-    def _extract(self, page, url: str) -> RawEvent | None:
+    async def _extract_all(self, context, urls: list[str]) -> list[RawEvent]:
+        """Extract detail pages on up to max_concurrency tabs of one context."""
+        sem = asyncio.Semaphore(max(1, self.max_concurrency))
+
+        async def _one(url: str) -> RawEvent | None:
+            async with sem:
+                page = await context.new_page()
+                try:
+                    return await self._extract(page, url)
+                finally:
+                    await page.close()
+
+        results = await asyncio.gather(*(_one(url) for url in urls))
+        return [event for event in results if event]
+
+    async def _extract(self, page, url: str) -> RawEvent | None:
         print(f"  [devfolio] Scraping: {url}")
         try:
-            page.goto(url, wait_until="networkidle")
-            soup = BeautifulSoup(page.content(), "html.parser")
-
-            for tag in soup(["script", "style"]):
-                tag.decompose()
-
-            text = soup.get_text(separator=" ")
-            lines = (line.strip() for line in text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            clean = "\n".join(c for c in chunks if c)
-
-            title = soup.title.string if soup.title else "No Title"
-            title = title.replace(" | Devfolio", "").strip()
-
-            return RawEvent(
-                title=title,
-                description=clean,
-                url=url,
-                location_text=clean,  # location engine will parse this
-                start_date=None,
-                source="devfolio",
-            )
+            await page.goto(url, wait_until="domcontentloaded")
+            try:
+                await page.wait_for_selector(self.DETAIL_READY_SELECTOR, timeout=5_000)
+            except Exception:
+                pass  # parse whatever rendered
+            html = await page.content()
+            # Cache write (SQLite + zlib) and parsing both block; keep them off the shared browser loop
+            return await asyncio.to_thread(self._store_and_parse, html, url)
         except Exception as e:
             print(f"  [devfolio] Error: {e}")
             return None
+
+    def _store_and_parse(self, html: str, url: str) -> RawEvent | None:
+        # No conditional GET through a browser -- skip on an identical page hash instead
+        if not http_cache.store(url, html):
+            http_cache.record(self.name, UNCHANGED)
+            print(f"  [devfolio] Unchanged since last run: {url}")
+            return None
+        http_cache.record(self.name, CHANGED)
+        return self._parse(html, url)
+
+    def _parse(self, html: str, url: str) -> RawEvent:
+        soup = BeautifulSoup(html, "html.parser")
+
+        for tag in soup(["script", "style"]):
+            tag.decompose()
+
+        text = soup.get_text(separator=" ")
+        lines = (line.strip() for line in text.splitlines())
+        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+        clean = "\n".join(c for c in chunks if c)
+
+        title = soup.title.string if soup.title else "No Title"
+        title = title.replace(" | Devfolio", "").strip()
+
+        return RawEvent(
+            title=title,
+            description=clean,
+            url=url,
+            location_text=clean,  # location engine will parse this
+            start_date=None,
+            source="devfolio",
+        )
@@ -0,0 +1,135 @@
+import hashlib
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+
+from ..config import get_settings
+
+settings = get_settings()
+
+# Per-source outcomes counted by the cache
+NOT_MODIFIED = "not_modified"  # server answered 304
+UNCHANGED = "unchanged"        # 200, but same content hash as last run
+CHANGED = "changed"            # new or modified body -- goes through the pipeline
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    etag: str | None
+    last_modified: str | None
+    content_hash: str
+    body: str
+
+
+class HTTPCache:
+    """
+    Persistent conditional-GET cache for scraper fetches, in its own SQLite file.
+
+    Stores each page's body with its ETag / Last-Modified validators and a content
+    hash. Entries start unconfirmed and are only trusted (validators sent, hash
+    compared) once the runner confirms the page made it into the events table, so a
+    run that dies between scrape and commit re-fetches everything next time.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._stats: dict[str, Counter] = defaultdict(Counter)
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS http_cache (
+                    url           TEXT PRIMARY KEY,
+                    etag          TEXT,
+                    last_modified TEXT,
+                    content_hash  TEXT NOT NULL,
+                    body          BLOB NOT NULL,
+                    fetched_at    REAL NOT NULL,
+                    confirmed     INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            self._conn.commit()
+        return self._conn
+
+    def get(self, url: str) -> CacheEntry | None:
+        """Confirmed entry for url, if any."""
+        with self._lock:
+            row = self._db().execute(
+                "SELECT etag, last_modified, content_hash, body FROM http_cache WHERE url = ? AND confirmed = 1",
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, content_hash, body = row
+        return CacheEntry(url, etag, last_modified, content_hash, zlib.decompress(body).decode("utf-8"))
+
+    def validators(self, entry: CacheEntry | None) -> dict[str, str]:
+        """Conditional request headers for a cached entry."""
+        headers = {}
+        if entry and entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry and entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def store(
+        self,
+        url: str,
+        body: str,
+        etag: str | None = None,
+        last_modified: str | None = None,
+        confirmed: bool = False,
+    ) -> bool:
+        """Save a fetched body. Returns False when it hashes the same as the confirmed entry."""
+        content_hash = hashlib.sha256(body.encode("utf-8")).hexdigest()
+        with self._lock:
+            db = self._db()
+            row = db.execute(
+                "SELECT content_hash FROM http_cache WHERE url = ? AND confirmed = 1", (url,)
+            ).fetchone()
+            unchanged = row is not None and row[0] == content_hash
+            db.execute(
+                """INSERT INTO http_cache (url, etag, last_modified, content_hash, body, fetched_at, confirmed)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (url) DO UPDATE SET
+                       etag = excluded.etag, last_modified = excluded.last_modified,
+                       content_hash = excluded.content_hash, body = excluded.body,
+                       fetched_at = excluded.fetched_at, confirmed = excluded.confirmed""",
+                (url, etag, last_modified, content_hash, zlib.compress(body.encode("utf-8")),
+                 time.time(), int(confirmed or unchanged)),
+            )
+            db.commit()
+        return not unchanged
+
+    def confirm(self, urls: list[str]):
+        """Mark pages as safely persisted downstream; their validators are used from now on."""
+        if not urls:
+            return
+        with self._lock:
+            db = self._db()
+            db.executemany("UPDATE http_cache SET confirmed = 1 WHERE url = ?", [(u,) for u in urls])
+            db.commit()
+
+    def record(self, source: str, outcome: str):
+        with self._lock:
+            self._stats[source][outcome] += 1
+
+    def stats(self, source: str) -> Counter:
+        """Running per-source outcome counts for this process (diff two snapshots for one run)."""
+        with self._lock:
+            return Counter(self._stats[source])
+
+
+def hit_rate(counts: Counter) -> float:
+    total = sum(counts.values())
+    return round((counts[NOT_MODIFIED] + counts[UNCHANGED]) / total, 3) if total else 0.0
+
+
+http_cache = HTTPCache(settings.HTTP_CACHE_PATH)
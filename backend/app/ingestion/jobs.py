@@ -0,0 +1,214 @@
+import threading
+import time
+import traceback
+import uuid
+from dataclasses import asdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from .. import models
+from ..background import held_lease
+from ..config import get_settings
+from ..database import SessionLocal
+from ..notifications.engine import match_and_notify
+from .runner import ALL_SCRAPERS, IngestionReport, run_ingestion
+
+settings = get_settings()
+
+ACTIVE_STATUSES = ("queued", "running")
+
+# Held (in the DB, so across API processes) while enqueue checks for active jobs and adds one
+ENQUEUE_LEASE = "ingest-enqueue"
+ENQUEUE_LEASE_SECONDS = 10  # shorter than the wait below, so a crashed holder can't block enqueues
+
+
+def enqueue_ingestion(
+    db,
+    sources: list[str] | None = None,
+    limit: int = 10,
+    trigger: str = "api",
+) -> tuple[models.IngestionJob, list[str]]:
+    """
+    Queue an ingestion job for the given sources (all when None).
+
+    Sources already queued or running in another job are left to that job; a DB
+    lease keeps two API processes from both queuing the same source. Returns (job, deduplicated_sources); if every requested source is already in
+    flight, job is the existing one that covers the first of them.
+    """
+    wanted = {s.lower() for s in sources} if sources else None
+    names = [s.name for s in ALL_SCRAPERS if wanted is None or s.name in wanted]
+    if not names:
+        raise ValueError(f"Unknown source(s): {', '.join(sorted(wanted))}")
+
+    with held_lease(db, ENQUEUE_LEASE, ENQUEUE_LEASE_SECONDS, wait_seconds=2 * ENQUEUE_LEASE_SECONDS) as held:
+        if not held:
+            print("  [jobs] Enqueue lease still busy; queuing without the cross-process check")
+        active = db.query(models.IngestionJob).filter(
+            models.IngestionJob.status.in_(ACTIVE_STATUSES)
+        ).order_by(models.IngestionJob.created_at).all()
+        busy = {name: job for job in active for name in job.sources}
+        deduplicated = [name for name in names if name in busy]
+        fresh = [name for name in names if name not in busy]
+        if not fresh:
+            return busy[deduplicated[0]], deduplicated
+
+        job = models.IngestionJob(sources=fresh, limit=limit, trigger=trigger, status="queued", stages={})
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+
+    print(f"  [jobs] Queued {job.id} ({', '.join(fresh)})")
+    job_workers.wake()
+    return job, deduplicated
+
+
+def claim_next_job(db) -> uuid.UUID | None:
+    """
+    Atomically move the oldest runnable queued job to running and return its id.
+    A job waits while another running job shares one of its sources; running
+    jobs whose heartbeat went stale (worker process died) are failed first.
+    """
+    now = datetime.utcnow()
+    stale_before = now - timedelta(seconds=4 * settings.INGEST_HEARTBEAT_SECONDS)
+    db.execute(
+        update(models.IngestionJob)
+        .where(models.IngestionJob.status == "running", models.IngestionJob.heartbeat_at < stale_before)
+        .values(status="failed", error="worker stopped responding", finished_at=now)
+    )
+    db.commit()
+
+    jobs = db.query(models.IngestionJob).filter(
+        models.IngestionJob.status.in_(ACTIVE_STATUSES)
+    ).order_by(models.IngestionJob.created_at).all()
+    running = {name for job in jobs if job.status == "running" for name in job.sources}
+    for job in jobs:
+        if job.status != "queued" or running.intersection(job.sources):
+            continue
+        claimed = db.execute(
+            update(models.IngestionJob)
+            .where(models.IngestionJob.id == job.id, models.IngestionJob.status == "queued")
+            .values(status="running", started_at=now, heartbeat_at=now)
+        ).rowcount
+        db.commit()
+        if claimed:
+            return job.id
+    return None
+
+
+def run_job(job_id: uuid.UUID):
+    """Run a claimed job: ingestion, then notifications. Records stage timings and the outcome."""
+    db = SessionLocal()
+    report = IngestionReport()
+    job = None
+    try:
+        job = db.get(models.IngestionJob, job_id)
+        print(f"  [jobs] Running {job.id} ({', '.join(job.sources)})")
+        new_events = run_ingestion(db, limit=job.limit, sources=job.sources, report=report)
+
+        start = time.monotonic()
+        match_and_notify(db, new_events)
+        report.stages["notify"] = round(time.monotonic() - start, 3)
+
+        job.status = "done"
+        job.result = {
+            "new_events": report.new,
+            "updated_events": report.updated,
+            "unchanged_events": report.skipped,
+            "sources": {name: asdict(src) for name, src in report.sources.items()},
+        }
+    except Exception as e:
+        traceback.print_exc()
+        db.rollback()
+        job = db.get(models.IngestionJob, job_id)
+        job.status = "failed"
+        job.error = str(e) or type(e).__name__
+    finally:
+        if job is not None:
+            job.stages = report.stages
+            job.finished_at = datetime.utcnow()
+            db.commit()
+            print(f"  [jobs] {job_id} {job.status}")
+        db.close()
+
+
+class JobWorkers:
+    """
+    Threads that claim queued ingestion jobs from the ingestion_jobs table and run
+    them. The table is the queue (SQLite by default, no broker), so several API
+    processes can each run workers against it; a heartbeat thread keeps this
+    process's running jobs from being taken for dead.
+    """
+
+    def __init__(self):
+        self._threads: list[threading.Thread] = []
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._running: set[uuid.UUID] = set()
+        self._lock = threading.Lock()
+
+    def start(self, count: int):
+        if self._threads or count < 1:
+            return
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"ingest-worker-{i}", daemon=True) for i in range(count)
+        ]
+        self._threads.append(threading.Thread(target=self._heartbeat, name="ingest-heartbeat", daemon=True))
+        for thread in self._threads:
+            thread.start()
+        print(f"  [jobs] {count} ingestion worker(s) started")
+
+    def stop(self, timeout: float = 5):
+        """Stop claiming jobs. A job still running is abandoned and later marked failed."""
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def wake(self):
+        """Nudge idle workers to look for a job now instead of at the next poll."""
+        self._wake.set()
+
+    def _work(self):
+        while not self._stop.is_set():
+            try:
+                with SessionLocal() as db:
+                    job_id = claim_next_job(db)
+            except Exception as e:
+                print(f"  [jobs] Claim failed: {e}")
+                job_id = None
+            if job_id is None:
+                self._wake.wait(settings.INGEST_POLL_SECONDS)
+                self._wake.clear()
+                continue
+            with self._lock:
+                self._running.add(job_id)
+            try:
+                run_job(job_id)
+            except Exception as e:
+                print(f"  [jobs] Job {job_id} crashed: {e}")
+            finally:
+                with self._lock:
+                    self._running.discard(job_id)
+
+    def _heartbeat(self):
+        while not self._stop.wait(settings.INGEST_HEARTBEAT_SECONDS):
+            with self._lock:
+                running = list(self._running)
+            if not running:
+                continue
+            try:
+                with SessionLocal() as db:
+                    db.execute(
+                        update(models.IngestionJob)
+                        .where(models.IngestionJob.id.in_(running))
+                        .values(heartbeat_at=datetime.utcnow())
+                    )
+                    db.commit()
+            except Exception as e:
+                print(f"  [jobs] Heartbeat failed: {e}")
+
+
+job_workers = JobWorkers()
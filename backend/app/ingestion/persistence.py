@@ -0,0 +1,71 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..database import upsert_insert
+
+# Columns an upsert rewrites on an existing row (url, source, created_at stay as first stored)
+UPDATE_COLUMNS = [
+    "title", "description", "city", "event_type", "lat", "lon",
+    "food_score", "relevance_score", "total_score", "food_confidence",
+    "keywords", "start_date", "content_hash",
+]
+
+
+def upsert_events(db: Session, rows: list[dict]) -> tuple[dict[str, uuid.UUID], dict[str, uuid.UUID]]:
+    """
+    Store event rows with batched INSERT ... ON CONFLICT (url) DO UPDATE statements.
+
+    Returns (inserted, updated) as url -> id maps read back via RETURNING. Every row
+    in a batch carries the same created_at, which the update never touches -- a
+    returned created_at equal to it means the row was inserted.
+    Does not commit.
+    """
+    if not rows:
+        return {}, {}
+
+    batch_ts = datetime.utcnow()
+    stmt = upsert_insert(db, models.Event)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.Event.url],
+        set_={col: stmt.excluded[col] for col in UPDATE_COLUMNS},
+    ).returning(models.Event.id, models.Event.url, models.Event.created_at)
+
+    # executemany form: SQLAlchemy packs the rows into multi-VALUES batches itself
+    # ("insertmanyvalues"), sized to the driver's parameter limit, with one cached compile
+    params = [{**row, "id": uuid.uuid4(), "created_at": batch_ts} for row in rows]
+
+    inserted: dict[str, uuid.UUID] = {}
+    updated: dict[str, uuid.UUID] = {}
+    for event_id, url, created_at in db.execute(stmt, params):
+        (inserted if created_at == batch_ts else updated)[url] = event_id
+
+    return inserted, updated
+
+
+def insert_events(db: Session, rows: list[dict]) -> dict[str, uuid.UUID]:
+    """
+    Store event rows with batched INSERT ... ON CONFLICT (url) DO NOTHING statements.
+
+    Returns url -> id for the rows actually inserted; a url some other writer
+    stored first is left as that writer stored it. Does not commit.
+    """
+    if not rows:
+        return {}
+
+    batch_ts = datetime.utcnow()
+    stmt = upsert_insert(db, models.Event).on_conflict_do_nothing(
+        index_elements=[models.Event.url],
+    ).returning(models.Event.id, models.Event.url)
+    params = [{**row, "id": uuid.uuid4(), "created_at": batch_ts} for row in rows]
+    return {url: event_id for event_id, url in db.execute(stmt, params)}
+
+
+def load_events(db: Session, ids: list[uuid.UUID], chunk: int = 500) -> list[models.Event]:
+    """ORM objects for freshly stored rows, in a few IN (...) queries."""
+    events = []
+    for i in range(0, len(ids), chunk):
+        events.extend(db.query(models.Event).filter(models.Event.id.in_(ids[i:i + chunk])).all())
+    return events
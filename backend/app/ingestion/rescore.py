@@ -0,0 +1,152 @@
+import argparse
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..analytics.rollups import rebuild_rollups
+from ..background import acquire_lease, lease_holder, release_lease
+from ..cache import response_cache
+from ..config import get_settings
+from ..database import SessionLocal, engine
+from ..intelligence.analysis import analyze_many, process_pool
+
+settings = get_settings()
+
+# Columns derived from the description alone -- everything a SCORING / weight change can move
+SCORE_COLUMNS = ["food_score", "relevance_score", "total_score", "food_confidence", "keywords"]
+
+# DB lease held while a rescore runs, in whichever process; renewed after every chunk
+LEASE_NAME = "rescore"
+LEASE_SECONDS = 600
+
+
+def claim_rescore() -> str | None:
+    """Take the rescore lease for a new run: its holder id, or None while another one runs."""
+    holder = lease_holder()
+    with SessionLocal() as db:
+        return holder if acquire_lease(db, LEASE_NAME, holder, LEASE_SECONDS) else None
+
+
+@dataclass
+class RescoreReport:
+    scanned: int = 0
+    changed: int = 0
+    seconds: float = 0.0
+
+
+def rescore_events(
+    chunk_size: int | None = None,
+    workers: int | None = None,
+    report: RescoreReport | None = None,
+    holder: str | None = None,
+) -> RescoreReport:
+    """
+    Recompute the score columns of every stored event from its description.
+
+    Reads in chunks of RESCORE_CHUNK_SIZE -- a server-side cursor where the driver
+    has one, keyset pages on id for SQLite (whose single writer can't commit
+    under an open read cursor) -- so memory stays flat however big the table is.
+    Each chunk is analyzed on a process pool and only rows whose scores moved are
+    written back, in one bulk UPDATE committed per chunk. Prints progress and ETA.
+
+    Only one rescore runs at a time across processes: pass the holder from
+    claim_rescore(), or it is claimed here (RuntimeError when another one runs).
+    The lease is released on return.
+    """
+    holder = holder or claim_rescore()
+    if holder is None:
+        raise RuntimeError("A rescore is already running")
+    try:
+        return _rescore(chunk_size, workers, report, holder)
+    finally:
+        with SessionLocal() as db:
+            release_lease(db, LEASE_NAME, holder)
+
+
+def _rescore(chunk_size: int | None, workers: int | None, report: RescoreReport | None, holder: str) -> RescoreReport:
+    chunk_size = chunk_size or settings.RESCORE_CHUNK_SIZE
+    report = report if report is not None else RescoreReport()
+    start = time.perf_counter()
+
+    with SessionLocal() as db:
+        total = db.scalar(select(func.count(models.Event.id)))
+    print(f"  [rescore] {total} events, chunks of {chunk_size}")
+
+    pool = process_pool(workers)
+    with pool if pool is not None else nullcontext(), SessionLocal() as db:
+        for chunk in _stream_chunks(chunk_size):
+            changed = _rescore_chunk(db, chunk, pool)
+            db.commit()
+            if not acquire_lease(db, LEASE_NAME, holder, LEASE_SECONDS):
+                raise RuntimeError("Rescore lease lost to another process")
+
+            report.scanned += len(chunk)
+            report.changed += len(changed)
+            elapsed = time.perf_counter() - start
+            rate = report.scanned / elapsed if elapsed else 0.0
+            eta = (total - report.scanned) / rate if rate else 0.0
+            print(f"  [rescore] {report.scanned}/{total} ({report.scanned / max(total, 1):.0%}), "
+                  f"{report.changed} changed, {rate:.0f} rows/s, ETA {eta:.0f}s")
+
+    if report.changed:
+        with SessionLocal() as db:
+            rebuild_rollups(db)  # food counts may have moved; a full pass already happened
+            response_cache.bump(db)
+    report.seconds = round(time.perf_counter() - start, 1)
+    print(f"  [rescore] Done: {report.changed} of {report.scanned} events changed in {report.seconds}s")
+    return report
+
+
+def _stream_chunks(chunk_size: int):
+    """Yield lists of (id, description, *SCORE_COLUMNS) rows, in id order."""
+    columns = [models.Event.id, models.Event.description,
+               *(getattr(models.Event, col) for col in SCORE_COLUMNS)]
+
+    if engine.dialect.name == "sqlite":
+        last_id = None
+        with SessionLocal() as db:
+            while True:
+                query = select(*columns).order_by(models.Event.id).limit(chunk_size)
+                if last_id is not None:
+                    query = query.where(models.Event.id > last_id)
+                rows = db.execute(query).all()
+                db.rollback()  # release the read lock before the chunk is written
+                if not rows:
+                    return
+                yield rows
+                last_id = rows[-1].id
+    else:
+        with engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(
+                select(*columns).order_by(models.Event.id)
+            )
+            yield from result.partitions()
+
+
+def _rescore_chunk(db: Session, rows, pool) -> list[dict]:
+    """Analyze one chunk and bulk-update the rows whose scores changed."""
+    # workers=1: without a shared pool, stay in-process rather than spawn one per chunk
+    analyses = analyze_many([(row.description or "", "") for row in rows], workers=1, pool=pool)
+    changed = []
+    for row, analysis in zip(rows, analyses):
+        new = {col: getattr(analysis, col) for col in SCORE_COLUMNS}
+        if any(getattr(row, col) != value for col, value in new.items()):
+            changed.append({"id": row.id, **new})
+    if changed:
+        db.execute(update(models.Event), changed)
+    return changed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute event scores from stored descriptions.")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    try:
+        rescore_events(chunk_size=args.chunk_size, workers=args.workers)
+    except RuntimeError as e:
+        parser.exit(1, f"{e}\n")
@@ -1,12 +1,24 @@
+import asyncio
+import inspect
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
 from sqlalchemy.orm import Session
 from .. import models
-from ..intelligence.detector import detect_food
-from ..intelligence.scorer import compute_score
-from ..intelligence.geo import extract_location, detect_event_type, geocode
-from .base import RawEvent
+from ..analytics.rollups import Counted, apply_deltas, deltas
+from ..cache import response_cache
+from ..config import get_settings
+from ..intelligence.analysis import Analysis, analyze_many
+from ..intelligence.geo import geocode
+from ..intelligence.spatial import event_index
+from .base import BaseScraper, RawEvent
+from .http_cache import http_cache, hit_rate
+from .persistence import insert_events, upsert_events, load_events
 from .devfolio import DevfolioScraper
 from .unstop import UnstopScraper
 
+settings = get_settings()
+
 
 ALL_SCRAPERS = [
     DevfolioScraper(),
@@ -14,82 +26,223 @@ ALL_SCRAPERS = [
 ]
 
 
-def run_ingestion(db: Session, limit: int = 10, sources: list[str] | None = None):
+@dataclass
+class SourceReport:
+    """Outcome of one scraper in an ingestion run."""
+    status: str = "pending"  # ok / failed / timeout
+    events: int = 0
+    seconds: float = 0.0
+    error: str | None = None
+    cache: dict = field(default_factory=dict)  # HTTP cache outcomes + hit_rate for this run
+
+
+@dataclass
+class IngestionReport:
+    """Filled in by run_ingestion for callers that want more than the new events."""
+    sources: dict[str, SourceReport] = field(default_factory=dict)
+    new: int = 0
+    updated: int = 0
+    skipped: int = 0  # unchanged content or stored meanwhile by another run, no DB write
+    stages: dict[str, float] = field(default_factory=dict)  # stage -> seconds
+
+
+def scrape_sources(
+    limit: int = 10,
+    sources: list[str] | None = None,
+    report: IngestionReport | None = None,
+) -> list[RawEvent]:
     """
-    Master ingestion pipeline:
-    1. Run scrapers
-    2. Detect food + score
-    3. Extract location + geocode
-    4. Dedup by URL
-    5. Store to DB
-    Returns list of newly saved events.
+    Run the selected scrapers in parallel, each bounded by SCRAPE_TIMEOUT_SECONDS.
+    A failed or timed-out source is recorded in the report; the others still count.
     """
-    raw_events: list[RawEvent] = []
+    report = report if report is not None else IngestionReport()
+    wanted = {s.lower() for s in sources} if sources else None
+    scrapers = [s for s in ALL_SCRAPERS if wanted is None or s.name in wanted]
+    if not scrapers:
+        return []
 
-    for scraper in ALL_SCRAPERS:
-        if sources and scraper.__class__.__name__.lower().replace("scraper", "") not in [s.lower() for s in sources]:
-            continue
+    elapsed: dict[str, float] = {}
+
+    cache_before = {s.name: http_cache.stats(s.name) for s in scrapers}
+
+    def _run(scraper: BaseScraper) -> list[RawEvent]:
+        start = time.monotonic()
         try:
-            raw_events.extend(scraper.scrape(limit=limit))
-        except Exception as e:
-            print(f"  [ingestion] Scraper {scraper.__class__.__name__} failed: {e}")
+            if inspect.iscoroutinefunction(scraper.scrape):
+                return asyncio.run(scraper.scrape(limit=limit))
+            return scraper.scrape(limit=limit)
+        finally:
+            elapsed[scraper.name] = round(time.monotonic() - start, 2)
+
+    pool = ThreadPoolExecutor(max_workers=len(scrapers), thread_name_prefix="scraper")
+    futures = {}
+    for scraper in scrapers:
+        report.sources[scraper.name] = SourceReport()
+        futures[pool.submit(_run, scraper)] = scraper
+    done, _ = wait(futures, timeout=settings.SCRAPE_TIMEOUT_SECONDS)
+    # Don't block on stragglers -- their threads finish in the background and are discarded
+    pool.shutdown(wait=False, cancel_futures=True)
+
+    raw_events: list[RawEvent] = []
+    for future, scraper in futures.items():
+        entry = report.sources[scraper.name]
+        entry.seconds = elapsed.get(scraper.name, settings.SCRAPE_TIMEOUT_SECONDS)
+        cache_counts = http_cache.stats(scraper.name) - cache_before[scraper.name]
+        entry.cache = {**cache_counts, "hit_rate": hit_rate(cache_counts)}
+        if future not in done:
+            entry.status = "timeout"
+            entry.error = f"no result after {settings.SCRAPE_TIMEOUT_SECONDS}s"
+            print(f"  [ingestion] Scraper {scraper.name} timed out")
+        elif future.exception():
+            entry.status = "failed"
+            entry.error = str(future.exception())
+            print(f"  [ingestion] Scraper {scraper.name} failed: {entry.error}")
+        else:
+            events = future.result()
+            entry.status = "ok"
+            entry.events = len(events)
+            raw_events.extend(events)
+            print(f"  [ingestion] {scraper.name}: {len(events)} events, "
+                  f"cache hit rate {entry.cache['hit_rate']:.0%}")
+
+    return raw_events
+
+
+def run_ingestion(
+    db: Session,
+    limit: int = 10,
+    sources: list[str] | None = None,
+    report: IngestionReport | None = None,
+):
+    """
+    Master ingestion pipeline:
+    1. Run scrapers (in parallel)
+    2. Dedup by URL, skipping events whose content hash is unchanged
+    3. Detect food + score, extract location (process pool for large batches)
+    4. Geocode
+    5. Store to DB (batched upsert), with the analytics rollups in the same transaction
+    Returns list of newly saved events. Pass a report to get per-source outcomes.
+    """
+    report = report if report is not None else IngestionReport()
+    stage_start = time.monotonic()
+
+    def stage_done(name: str):
+        nonlocal stage_start
+        now = time.monotonic()
+        report.stages[name] = round(now - stage_start, 3)
+        stage_start = now
+
+    raw_events = scrape_sources(limit=limit, sources=sources, report=report)
+    stage_done("scrape")
 
+    # Same URL twice in one batch would collide on the unique index -- last one wins
+    raw_events = list({raw.url: raw for raw in raw_events}.values())
     print(f"  [ingestion] Total raw events: {len(raw_events)}")
 
-    new_events = []
-    updated_count = 0
+    # One lookup of url -> (id, content_hash) for the whole batch
+    known = _existing_by_url(db, [raw.url for raw in raw_events])
+
+    pending = []
+    skipped = 0
 
     for raw in raw_events:
-        # Intelligence
-        food_detected, keywords, food_score = detect_food(raw.description)
-        city = extract_location(raw.location_text)
-        event_type = detect_event_type(raw.description)
-        relevance_score = compute_score(food_score, raw.description)
-        
-        # New V4 Scoring System
-        total_score = food_score + relevance_score
-        food_confidence = 1.0 if food_detected else 0.0
-
-        lat, lon = geocode(city)
-
-        # Upsert Dedup
-        existing = db.query(models.Event).filter(models.Event.url == raw.url).first()
+        content_hash = raw.content_hash()
+        existing = known.get(raw.url)
+        if existing and existing.content_hash == content_hash:
+            skipped += 1
+            continue
         if existing:
             print(f"  [dedup] Updating existing: {raw.title}")
-            existing.title = raw.title
-            existing.description = raw.description[:5000]
-            existing.city = city
-            existing.event_type = event_type
-            existing.lat = lat
-            existing.lon = lon
-            existing.food_score = food_score
-            existing.relevance_score = relevance_score
-            existing.total_score = total_score
-            existing.food_confidence = food_confidence
-            existing.keywords = keywords
-            existing.start_date = raw.start_date
-            updated_count += 1
         else:
             print(f"  [new] Inserting: {raw.title}")
-            event = models.Event(
-                title=raw.title,
-                description=raw.description[:5000],
-                url=raw.url,
-                city=city,
-                event_type=event_type,
-                lat=lat,
-                lon=lon,
-                food_score=food_score,
-                relevance_score=relevance_score,
-                total_score=total_score,
-                food_confidence=food_confidence,
-                source=raw.source,
-                keywords=keywords,
-                start_date=raw.start_date,
-            )
-            db.add(event)
-            new_events.append(event)
+        pending.append((raw, content_hash))
 
+    # Text analysis fans out to worker processes for large batches; geocoding stays here
+    analyses = analyze_many([(raw.description, raw.location_text) for raw, _ in pending])
+    stage_done("analyze")
+    rows = [_event_row(raw, content_hash, analysis) for (raw, content_hash), analysis in zip(pending, analyses)]
+    stage_done("geocode")
+
+    # Batched INSERT ... ON CONFLICT (url); inserted vs updated comes back from RETURNING.
+    # Rows the lookup did not find are only inserted: one another writer stored since
+    # stays as that writer stored (and counted in the rollups) it
+    inserted = insert_events(db, [row for row in rows if row["url"] not in known])
+    reinserted, updated = upsert_events(db, [row for row in rows if row["url"] in known])
+    inserted.update(reinserted)
+    raced = len(rows) - len(inserted) - len(updated)
+    rows = [row for row in rows if row["url"] in inserted or row["url"] in updated]
+    new_events = load_events(db, list(inserted.values()))
+    ids = {**inserted, **updated}
+    points = [(ids[row["url"]], row["lat"], row["lon"]) for row in rows if _moved(row, known, inserted)]
+    apply_deltas(db, _rollup_deltas(new_events, rows, updated, known))
     db.commit()
-    print(f"  [ingestion] {len(new_events)} new, {updated_count} updated.")
+    # Pages are now safely stored; their cache entries can short-circuit the next run
+    http_cache.confirm([raw.url for raw in raw_events])
+    if points:
+        event_index.committed(db, points)
+    if rows:
+        response_cache.bump(db)
+    stage_done("store")
+    report.new, report.updated, report.skipped = len(inserted), len(updated), skipped + raced
+    print(f"  [ingestion] {len(inserted)} new, {len(updated)} updated, {skipped} unchanged"
+          + (f", {raced} stored by another run." if raced else "."))
     return new_events
+
+
+def _event_row(raw: RawEvent, content_hash: str, analysis: Analysis) -> dict:
+    """Geocode an analyzed raw event and build its events-table row."""
+    lat, lon = geocode(analysis.city)
+
+    return {
+        "title": raw.title,
+        "description": raw.description[:5000],
+        "url": raw.url,
+        "city": analysis.city,
+        "event_type": analysis.event_type,
+        "lat": lat,
+        "lon": lon,
+        "food_score": analysis.food_score,
+        "relevance_score": analysis.relevance_score,
+        "total_score": analysis.total_score,
+        "food_confidence": analysis.food_confidence,
+        "source": raw.source,
+        "keywords": analysis.keywords,
+        "start_date": raw.start_date,
+        "content_hash": content_hash,
+    }
+
+
+def _rollup_deltas(new_events: list[models.Event], rows: list[dict], updated: dict, known: dict) -> dict:
+    """Analytics rollup changes for a batch: inserted events, plus city / food changes of updated ones."""
+    added = [Counted(e.created_at, e.source, e.city, e.food_score) for e in new_events]
+    removed = []
+    for row in rows:
+        old = known.get(row["url"])
+        if row["url"] in updated and old is not None:
+            # source and created_at are never rewritten by the upsert
+            removed.append(Counted(old.created_at, old.source, old.city, old.food_score))
+            added.append(Counted(old.created_at, old.source, row["city"], row["food_score"]))
+    return deltas(added, removed)
+
+
+def _moved(row: dict, known: dict, inserted: dict) -> bool:
+    """Whether storing row added, moved or unlocated a point in the spatial index."""
+    if row["url"] in inserted:
+        return row["lat"] is not None and row["lon"] is not None
+    old = known.get(row["url"])
+    return old is None or (old.lat, old.lon) != (row["lat"], row["lon"])
+
+
+def _existing_by_url(db: Session, urls: list[str], chunk: int = 500) -> dict:
+    """url -> (id, content_hash, rollup fields, lat, lon) row for events already stored, in a few IN (...) queries."""
+    found = {}
+    for i in range(0, len(urls), chunk):
+        rows = db.query(
+            models.Event.url, models.Event.id, models.Event.content_hash,
+            models.Event.created_at, models.Event.source, models.Event.city, models.Event.food_score,
+            models.Event.lat, models.Event.lon,
+        ).filter(
+            models.Event.url.in_(urls[i:i + chunk])
+        ).all()
+        found.update({row.url: row for row in rows})
+    return found
@@ -0,0 +1,95 @@
+import hashlib
+from datetime import datetime, timedelta
+
+from .. import models
+from ..background import LeasedLoop
+from ..config import get_settings
+from .base import BaseScraper
+from .jobs import ACTIVE_STATUSES, enqueue_ingestion
+from .runner import ALL_SCRAPERS
+
+settings = get_settings()
+
+LEASE_NAME = "ingestion-scheduler"
+
+# Jobs looked at per tick to find each source's last run and failure streak
+HISTORY_JOBS = 200
+
+
+def _fraction(seed: str) -> float:
+    """Stable pseudo-random number in [0, 1) -- same seed, same jitter on every tick and process."""
+    return int(hashlib.sha256(seed.encode("utf-8")).hexdigest()[:8], 16) / 2 ** 32
+
+
+def _source_failed(job: models.IngestionJob, source: str) -> bool:
+    if job.status == "failed":
+        return True
+    outcome = ((job.result or {}).get("sources") or {}).get(source) or {}
+    return outcome.get("status") in ("failed", "timeout")
+
+
+class IngestionScheduler(LeasedLoop):
+    """
+    Queues an ingestion job per source on its own interval (scraper.schedule_interval,
+    or SCHEDULE_INTERVALS), +- scraper.schedule_jitter, doubling the wait after each
+    consecutive failed run up to SCHEDULE_MAX_BACKOFF_SECONDS.
+
+    Every API process runs one, but only the holder of a DB lease schedules, so
+    several uvicorn workers don't queue the same runs. Timing is derived from the
+    ingestion_jobs history on each tick, so a new leader carries on where the
+    last one stopped.
+    """
+
+    tag = "scheduler"
+
+    def __init__(self):
+        super().__init__(LEASE_NAME, settings.SCHEDULER_TICK_SECONDS, 3 * settings.SCHEDULER_TICK_SECONDS)
+        self._started_at = datetime.utcnow()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._started_at = datetime.utcnow()
+        super().start()
+        print(f"  [scheduler] Started ({self.holder})")
+
+    def interval(self, scraper: BaseScraper) -> int:
+        return settings.SCHEDULE_INTERVALS.get(scraper.name, scraper.schedule_interval)
+
+    def tick(self, db, now: datetime | None = None):
+        """Queue a job for every source that is due."""
+        now = now or datetime.utcnow()
+        recent = db.query(models.IngestionJob).order_by(
+            models.IngestionJob.created_at.desc()
+        ).limit(HISTORY_JOBS).all()
+        for scraper in ALL_SCRAPERS:
+            history = [job for job in recent if scraper.name in (job.sources or [])]
+            due = self.next_run(scraper, history)
+            if due is not None and due <= now:
+                enqueue_ingestion(db, sources=[scraper.name], limit=settings.SCRAPE_LIMIT, trigger="schedule")
+
+    def next_run(self, scraper: BaseScraper, history: list[models.IngestionJob]) -> datetime | None:
+        """When scraper is next due, given its jobs newest first. None while one is in flight."""
+        interval = self.interval(scraper)
+        if not history:
+            # Never run: stagger first runs across the jitter window instead of all at startup
+            offset = interval * scraper.schedule_jitter * _fraction(scraper.name)
+            return self._started_at + timedelta(seconds=offset)
+
+        last = history[0]
+        if last.status in ACTIVE_STATUSES:
+            return None
+        failures = 0
+        for job in history:
+            if job.status in ACTIVE_STATUSES or not _source_failed(job, scraper.name):
+                break
+            failures += 1
+
+        delay = interval
+        if failures:
+            delay = min(interval * 2 ** failures, settings.SCHEDULE_MAX_BACKOFF_SECONDS)
+        delay *= 1 + scraper.schedule_jitter * (2 * _fraction(str(last.id)) - 1)
+        return (last.finished_at or last.created_at) + timedelta(seconds=delay)
+
+
+ingestion_scheduler = IngestionScheduler()
@@ -1,51 +1,39 @@
-import requests
+from urllib.parse import urljoin
 from bs4 import BeautifulSoup
-from .base import BaseScraper, RawEvent
+from .base import AsyncHTTPScraper, HTTPPool, RawEvent
 
 
-class UnstopScraper(BaseScraper):
+class UnstopScraper(AsyncHTTPScraper):
     """Scrape public hackathon listings from Unstop."""
+    name = "unstop"
     BASE_URL = "https://unstop.com/hackathons"
 
-    def scrape(self, limit: int = 10) -> list[RawEvent]:
-        results = []
-        try:
-            print(f"  [unstop] Fetching {self.BASE_URL}...")
-            resp = requests.get(self.BASE_URL, timeout=15, headers={
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-            })
-            resp.raise_for_status()
-            soup = BeautifulSoup(resp.text, "html.parser")
-
-            # Unstop uses card-based layout. Links follow /hackathons/slug-id pattern.
-            links = []
-            for a in soup.find_all("a", href=True):
-                href = a["href"]
-                if "/hackathons/" in href and href not in links:
-                    if not href.startswith("http"):
-                        href = "https://unstop.com" + href
+    async def collect(self, http: HTTPPool, limit: int) -> list[RawEvent]:
+        print(f"  [unstop] Fetching {self.BASE_URL}...")
+        listing, _ = await http.fetch(self.BASE_URL, confirm=True)
+        soup = BeautifulSoup(listing, "html.parser")
+
+        # Unstop uses card-based layout. Links follow /hackathons/slug-id pattern.
+        links = []
+        for a in soup.find_all("a", href=True):
+            href = a["href"]
+            if "/hackathons/" in href:
+                href = urljoin(self.BASE_URL, href)
+                if href not in links:
                     links.append(href)
 
-            print(f"  [unstop] Found {len(links)} listings. Scraping top {min(limit, len(links))}...")
-
-            for url in links[:limit]:
-                event = self._extract(url)
-                if event:
-                    results.append(event)
-
-        except Exception as e:
-            print(f"  [unstop] Error: {e}")
+        print(f"  [unstop] Found {len(links)} listings. Scraping top {min(limit, len(links))}...")
 
-        return results
+        return await self.gather_limited(links[:limit], lambda url: self._extract(http, url))
 
-    def _extract(self, url: str) -> RawEvent | None:
+    async def _extract(self, http: HTTPPool, url: str) -> RawEvent | None:
         try:
             print(f"  [unstop] Scraping: {url}")
-            resp = requests.get(url, timeout=15, headers={
-                "User-Agent": "Mozilla/5.0"
-            })
-            resp.raise_for_status()
-            soup = BeautifulSoup(resp.text, "html.parser")
+            html, changed = await http.fetch(url)
+            if not changed:
+                print(f"  [unstop] Unchanged since last run: {url}")
+                return None
+            soup = BeautifulSoup(html, "html.parser")
 
             for tag in soup(["script", "style"]):
                 tag.decompose()
@@ -0,0 +1,85 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from ..config import get_settings
+from .geo import extract_location
+from .text import analyze_text
+
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class Analysis:
+    """Scores and location the intelligence stage derives from one event's text."""
+    food_detected: bool
+    keywords: list[str]
+    food_score: int
+    relevance_score: int
+    total_score: int
+    food_confidence: float
+    event_type: str
+    city: str
+
+
+def analyze(description: str, location_text: str) -> Analysis:
+    """Run the text analysis for one event. Pure CPU; no geocoding, no I/O."""
+    signals = analyze_text(description)
+    return Analysis(
+        food_detected=signals.food_detected,
+        keywords=signals.food_keywords,
+        food_score=signals.food_score,
+        relevance_score=signals.relevance_score,
+        # New V4 Scoring System
+        total_score=signals.food_score + signals.relevance_score,
+        food_confidence=1.0 if signals.food_detected else 0.0,
+        event_type=signals.event_type,
+        city=extract_location(location_text),
+    )
+
+
+def _analyze_chunk(items: list[tuple[str, str]]) -> list[Analysis]:
+    return [analyze(description, location_text) for description, location_text in items]
+
+
+def process_pool(workers: int | None = None) -> ProcessPoolExecutor | None:
+    """
+    A process pool for analyze_many, to reuse across many calls (e.g. a long
+    rescore). None when there's only one worker to give it.
+    """
+    workers = workers or settings.ANALYSIS_WORKERS or os.cpu_count() or 1
+    if workers < 2:
+        return None
+    # spawn, not fork: the API process runs threads (browser pool, index refresh)
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def analyze_many(
+    items: list[tuple[str, str]],
+    workers: int | None = None,
+    pool: ProcessPoolExecutor | None = None,
+) -> list[Analysis]:
+    """
+    analyze() over (description, location_text) pairs, in order.
+
+    Batches of ANALYSIS_PARALLEL_MIN_BATCH or more fan out to a process pool in
+    chunks of ANALYSIS_CHUNK_SIZE, so each task pickles one list instead of one
+    item; smaller batches aren't worth the worker startup and run in-process.
+    Pass a pool from process_pool() to use it for every batch instead.
+    """
+    if pool is not None:
+        return _map_chunks(pool, items)
+    if len(items) < settings.ANALYSIS_PARALLEL_MIN_BATCH:
+        return _analyze_chunk(items)
+    pool = process_pool(workers)
+    if pool is None:
+        return _analyze_chunk(items)
+    with pool:
+        return _map_chunks(pool, items)
+
+
+def _map_chunks(pool: ProcessPoolExecutor, items: list[tuple[str, str]]) -> list[Analysis]:
+    size = settings.ANALYSIS_CHUNK_SIZE
+    chunks = [items[i:i + size] for i in range(0, len(items), size)]
+    return [analysis for chunk in pool.map(_analyze_chunk, chunks) for analysis in chunk]
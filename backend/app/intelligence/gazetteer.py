@@ -0,0 +1,207 @@
+import argparse
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import unicodedata
+from array import array
+from pathlib import Path
+
+from ..config import get_settings
+
+settings = get_settings()
+
+BUNDLED_SOURCE = Path(__file__).parent / "data" / "gazetteer.tsv"
+
+# File layout: header, lats f64[n], lons f64[n], name offsets u32[n+1],
+# key offsets u32[k+1], key -> place u32[k], name bytes, key bytes.
+# Keys are sorted (ties: most populous place first) for binary search.
+MAGIC = b"HPGZ"
+VERSION = 1
+HEADER = struct.Struct("=4sIIIII")  # magic, version, places, keys, name bytes, key bytes
+
+
+def normalize(name: str) -> str:
+    """Lookup key for a place name: accents stripped, casefolded, punctuation collapsed to spaces."""
+    decomposed = unicodedata.normalize("NFKD", name)
+    folded = "".join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
+    return " ".join("".join(ch if ch.isalnum() else " " for ch in folded).split())
+
+
+def build(source: Path, out: Path) -> int:
+    """
+    Compile a GeoNames-format TSV (name, asciiname, alternatenames, lat, lon ...,
+    population in column 15) into the binary gazetteer file. Returns the place count.
+    """
+    places = []
+    with open(source, encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("#") or not line.strip():
+                continue
+            cols = line.rstrip("\n").split("\t")
+            names = (cols[1], cols[2], *cols[3].split(","))
+            keys = {normalize(n) for n in names} - {""}
+            places.append((int(cols[14] or 0), cols[1], float(cols[4]), float(cols[5]), keys))
+    places.sort(key=lambda p: -p[0])  # most populous first, so it wins a shared name
+
+    entries = sorted((key.encode("utf-8"), i) for i, place in enumerate(places) for key in place[4])
+    names = [place[1].encode("utf-8") for place in places]
+    keys = [key for key, _ in entries]
+
+    def offsets(blobs):
+        out, pos = array("I", [0]), 0
+        for blob in blobs:
+            pos += len(blob)
+            out.append(pos)
+        return out.tobytes()
+
+    parts = [
+        HEADER.pack(MAGIC, VERSION, len(places), len(entries), sum(map(len, names)), sum(map(len, keys))),
+        array("d", [place[2] for place in places]).tobytes(),
+        array("d", [place[3] for place in places]).tobytes(),
+        offsets(names),
+        offsets(keys),
+        array("I", [i for _, i in entries]).tobytes(),
+        b"".join(names),
+        b"".join(keys),
+    ]
+
+    # Write-then-rename so workers building concurrently never map a half-written file
+    out = Path(out)
+    fd, tmp = tempfile.mkstemp(dir=out.parent, prefix=out.name, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        for part in parts:
+            f.write(part)
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, out)
+    return len(places)
+
+
+class Gazetteer:
+    """
+    Offline place lookup over a memory-mapped binary built from a GeoNames-style TSV.
+
+    Nothing is read until the first lookup. The file is then mapped read-only, so
+    every worker process shares the same pages; it is (re)built from the source
+    first if missing or older than the source.
+    """
+
+    def __init__(self, path: str, source: str):
+        self.path = Path(path)
+        self.source = Path(source)
+        self._mm: mmap.mmap | None = None
+        self._n_places = 0
+        self._n_keys = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        self._load()
+        return self._n_places
+
+    def _load(self):
+        if self._mm is not None:
+            return
+        with self._lock:
+            if self._mm is not None:
+                return
+            stale = self.source.exists() and (
+                not self.path.exists() or self.source.stat().st_mtime > self.path.stat().st_mtime
+            )
+            if stale:
+                count = build(self.source, self.path)
+                print(f"  [gazetteer] Built {count} places from {self.source.name}")
+            if not self.path.exists():
+                print(f"  [gazetteer] No gazetteer at {self.path} or {self.source}")
+                self._mm = mmap.mmap(-1, HEADER.size)
+                self._mm.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0, 0))
+            else:
+                with open(self.path, "rb") as f:
+                    self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._map(memoryview(self._mm))
+
+    def _map(self, view: memoryview):
+        magic, version, n, k, name_bytes, key_bytes = HEADER.unpack_from(view)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not a version {VERSION} gazetteer file")
+
+        def take(size: int, fmt: str = "B") -> memoryview:
+            nonlocal pos
+            part = view[pos:pos + size]
+            pos += size
+            return part.cast(fmt) if fmt != "B" else part
+
+        pos = HEADER.size
+        self._lats = take(8 * n, "d")
+        self._lons = take(8 * n, "d")
+        self._name_offsets = take(4 * (n + 1), "I")
+        self._key_offsets = take(4 * (k + 1), "I")
+        self._key_places = take(4 * k, "I")
+        self._names = take(name_bytes)
+        self._keys = take(key_bytes)
+        self._n_places, self._n_keys = n, k
+
+    def _key(self, i: int) -> bytes:
+        return self._keys[self._key_offsets[i]:self._key_offsets[i + 1]].tobytes()
+
+    def name(self, place: int) -> str:
+        return self._names[self._name_offsets[place]:self._name_offsets[place + 1]].tobytes().decode("utf-8")
+
+    def _candidates(self, key: bytes) -> list[int]:
+        """Places with this key, most populous first (binary search over the sorted keys)."""
+        lo, hi = 0, self._n_keys
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        places = []
+        while lo < self._n_keys and self._key(lo) == key:
+            places.append(self._key_places[lo])
+            lo += 1
+        return places
+
+    def lookup(self, name: str) -> tuple[float, float] | None:
+        """
+        (lat, lon) for a place name, or None. Matches on the normalized name (any
+        alternate spelling), preferring a place whose name is exactly the query,
+        then the most populous. "City, Region" falls back to just "City".
+        """
+        self._load()
+        queries = (name, name.split(",", 1)[0]) if "," in name else (name,)
+        for query in queries:
+            places = self._candidates(normalize(query).encode("utf-8"))
+            if places:
+                exact = query.strip().casefold()
+                place = next((p for p in places if self.name(p).casefold() == exact), places[0])
+                return self._lats[place], self._lons[place]
+        return None
+
+    def reverse(self, lat: float, lon: float, max_km: float | None = None) -> tuple[str, float] | None:
+        """Nearest place to (lat, lon) as (name, km), scanning the coordinate arrays in one pass."""
+        from .geo import haversine_many
+
+        self._load()
+        if not self._n_places:
+            return None
+        distances = haversine_many(lat, lon, self._lats, self._lons)
+        if hasattr(distances, "argmin"):
+            place = int(distances.argmin())
+        else:
+            place = min(range(self._n_places), key=distances.__getitem__)
+        km = float(distances[place])
+        if max_km is not None and km > max_km:
+            return None
+        return self.name(place), km
+
+
+gazetteer = Gazetteer(settings.GAZETTEER_PATH, settings.GAZETTEER_SOURCE or str(BUNDLED_SOURCE))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the binary gazetteer from a GeoNames-format TSV.")
+    parser.add_argument("--source", default=str(gazetteer.source))
+    parser.add_argument("--out", default=str(gazetteer.path))
+    args = parser.parse_args()
+    print(f"Built {build(Path(args.source), Path(args.out))} places into {args.out}")
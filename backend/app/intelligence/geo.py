@@ -1,37 +1,140 @@
 import re
 import math
+import threading
+import time
+from collections import Counter
 from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Iterable
+
+try:
+    import numpy as np
+except ImportError:  # optional -- batch distance helpers fall back to scalar math
+    np = None
+
+from ..config import get_settings
+from .gazetteer import gazetteer
+from .geocache import geocode_cache
+from .keywords import KeywordMatcher
+
+settings = get_settings()
 
 # --- City extraction ---
-KNOWN_CITIES = [
-    "Mumbai", "Delhi", "Bangalore", "Bengaluru", "Hyderabad", "Chennai",
-    "Kolkata", "Pune", "Ahmedabad", "Jaipur", "Lucknow", "Chandigarh",
-    "Indore", "Bhopal", "Kochi", "Coimbatore", "Nagpur", "Surat",
-    "Gurgaon", "Gurugram", "Noida", "Guwahati", "Bhubaneswar",
-    "Thiruvananthapuram", "Visakhapatnam", "Mangalore", "Mysore",
-    "New Delhi", "Navi Mumbai", "Thane",
-]
+CITIES_PATH = Path(__file__).parent / "data" / "cities.tsv"
+
+
+class CityMatcher:
+    """
+    Whole-word, case-insensitive city finder over one precompiled regex.
+
+    The names are folded into a character trie before compiling, so the
+    pattern tries one branch per character instead of every city at every
+    position -- lists of thousands of names cost about the same to scan as
+    thirty. Longer names win ("Navi Mumbai" over "Mumbai") and every alias
+    resolves to its canonical name.
+    """
+
+    STRATEGIES = ("earliest", "most_frequent")
+
+    def __init__(self, names: dict[str, str]):
+        """names: city name or alias -> canonical name."""
+        self._canonical = {self._key(name): city for name, city in names.items()}
+        self.cities = list(dict.fromkeys(names.values()))
+        pattern = _trie_pattern(self._canonical)
+        # Matched against lowercased text: much faster than re.IGNORECASE
+        self._regex = re.compile(r"\b(?:" + pattern + r")\b") if pattern else None
+
+    @classmethod
+    def from_file(cls, path: Path) -> "CityMatcher":
+        """Load a cities file: canonical name, then aliases, tab-separated; '#' starts a comment."""
+        names = {}
+        for line in Path(path).read_text(encoding="utf-8").splitlines():
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            city, *aliases = [part.strip() for part in line.split("\t") if part.strip()]
+            for name in (city, *aliases):
+                names[name] = city
+        return cls(names)
+
+    @staticmethod
+    def _key(name: str) -> str:
+        return " ".join(name.lower().split())
+
+    def find(self, text: str, strategy: str = "earliest") -> str | None:
+        """
+        Canonical city mentioned in text, or None.
+
+        earliest: the first mention. most_frequent: the city mentioned most
+        often (aliases counted together), ties going to the earliest.
+        """
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown strategy {strategy!r}, expected one of {self.STRATEGIES}")
+        if self._regex is None:
+            return None
+        text = text.lower()
+        if strategy == "earliest":
+            match = self._regex.search(text)
+            return self._canonical[self._key(match.group())] if match else None
+        counts = Counter(self._canonical[self._key(m.group())] for m in self._regex.finditer(text))
+        return max(counts, key=counts.get) if counts else None
+
+
+def _trie_pattern(names) -> str:
+    """Regex alternation for names, factored by common prefix (spaces match any whitespace)."""
+    trie: dict = {}
+    for name in names:
+        node = trie
+        for ch in name:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node: dict) -> str:
+        branches = [(r"\s+" if ch == " " else re.escape(ch)) + emit(child)
+                    for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # A name can end here: try the longer continuations first, then stop
+        if "" in node:
+            return "(?:" + body + ")?" if len(branches) == 1 else body + "?"
+        return body
+
+    return emit(trie)
+
+
+city_matcher = CityMatcher.from_file(CITIES_PATH)
+KNOWN_CITIES = city_matcher.cities
 
 ONLINE_SIGNALS = ["online", "virtual", "remote", "from anywhere", "virtual hackathon"]
 OFFLINE_SIGNALS = ["in-person", "in person", "on-site", "onsite", "on campus", "offline"]
 HYBRID_SIGNALS = ["hybrid", "both online and offline", "online & offline", "online and offline"]
+EVENT_TYPE_KEYWORDS = [*ONLINE_SIGNALS, *OFFLINE_SIGNALS, *HYBRID_SIGNALS]
 
+_event_type_matcher = KeywordMatcher(EVENT_TYPE_KEYWORDS)
 
-def extract_location(text: str) -> str:
-    """Extract first matched city from text. Returns 'Unknown' if none found."""
-    for city in KNOWN_CITIES:
-        if re.search(r'\b' + re.escape(city) + r'\b', text, re.IGNORECASE):
-            return city
-    return "Unknown"
+
+def extract_location(text: str, strategy: str = "most_frequent") -> str:
+    """
+    Canonical city named in text. Returns 'Unknown' if none found.
+
+    Scrapers pass whole page text, so by default the most-mentioned city wins
+    over, say, one mentioned in a footer; see CityMatcher.find for strategies.
+    """
+    return city_matcher.find(text, strategy) or "Unknown"
 
 
 def detect_event_type(text: str) -> str:
     """Detect Online / Offline / Hybrid."""
-    t = text.lower()
-    if any(s in t for s in HYBRID_SIGNALS):
+    return event_type_from_hits(_event_type_matcher.scan(text))
+
+
+def event_type_from_hits(hits: set[str]) -> str:
+    """detect_event_type on an already-scanned set of keyword hits (see KeywordMatcher)."""
+    if any(s in hits for s in HYBRID_SIGNALS):
         return "Hybrid"
-    has_off = any(s in t for s in OFFLINE_SIGNALS)
-    has_on = any(s in t for s in ONLINE_SIGNALS)
+    has_off = any(s in hits for s in OFFLINE_SIGNALS)
+    has_on = any(s in hits for s in ONLINE_SIGNALS)
     if has_off and has_on:
         return "Hybrid"
     if has_off:
@@ -62,29 +165,106 @@ CITY_COORDS: dict[str, tuple[float, float]] = {
 }
 
 
+_CITY_COORDS_BY_KEY = {CityMatcher._key(city): coords for city, coords in CITY_COORDS.items()}
+
+# Queries that name no place -- never sent to a geocoder
+UNRESOLVABLE = {"", "unknown"}
+
+# Geocoder errors (timeouts, outages) are remembered in-process only, this long
+ERROR_TTL_SECONDS = 300
+
+
+class NominatimGeocoder:
+    """
+    geopy's Nominatim client, built once and paced to its one-request-per-second policy.
+    Returns (lat, lon), or None when the place isn't found; network errors raise.
+    """
+
+    def __init__(self, user_agent: str, timeout: float = 5, min_interval: float = 1.0):
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.min_interval = min_interval
+        self._client = None
+        self._last_call = 0.0
+        self._lock = threading.Lock()
+
+    def __call__(self, query: str) -> tuple[float, float] | None:
+        with self._lock:
+            if self._client is None:
+                from geopy.geocoders import Nominatim
+                self._client = Nominatim(user_agent=self.user_agent, timeout=self.timeout)
+            wait = self._last_call + self.min_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                location = self._client.geocode(query)
+            finally:
+                self._last_call = time.monotonic()
+        return (location.latitude, location.longitude) if location else None
+
+
+# Network fallback for places not in CITY_COORDS; swap with set_geocoder (e.g. a stub in tests)
+_geocoder: Callable[[str], tuple[float, float] | None] = NominatimGeocoder(settings.NOMINATIM_USER_AGENT)
+
+
+def set_geocoder(geocoder: Callable[[str], tuple[float, float] | None]):
+    """Replace the network geocoder: any callable mapping a place name to (lat, lon) or None."""
+    global _geocoder
+    _geocoder = geocoder
+
+
 def geocode(city: str) -> tuple[float | None, float | None]:
     """
-    Get lat/lon for a city. Uses hardcoded coords first, then Nominatim fallback.
+    Get lat/lon for a city. Uses hardcoded coords first, then the offline
+    gazetteer, then the geocode cache, then the network geocoder (Nominatim by
+    default). Misses are cached too.
     """
     if city in CITY_COORDS:
         return CITY_COORDS[city]
 
-    # Fallback: try Nominatim (rate-limited, best-effort)
+    key = CityMatcher._key(city or "")
+    if key in UNRESOLVABLE:
+        return (None, None)
+    if key in _CITY_COORDS_BY_KEY:
+        return _CITY_COORDS_BY_KEY[key]
+
+    coords = gazetteer.lookup(city)
+    if coords:
+        return coords
+
+    found, coords = geocode_cache.get(key)
+    if found:
+        return coords or (None, None)
+
     try:
-        from geopy.geocoders import Nominatim
-        geolocator = Nominatim(user_agent="hackplate-ai/3.0")
-        location = geolocator.geocode(city, timeout=5)
-        if location:
-            return (location.latitude, location.longitude)
-    except Exception:
-        pass
+        coords = _geocoder(city)
+    except Exception as e:
+        print(f"  [geocode] {city!r} failed: {e}")
+        geocode_cache.put(key, None, ERROR_TTL_SECONDS, persist=False)
+        return (None, None)
+
+    ttl = settings.GEOCODE_TTL_DAYS * 86400 if coords else settings.GEOCODE_NEGATIVE_TTL_HOURS * 3600
+    geocode_cache.put(key, coords, ttl)
+    return coords or (None, None)
+
+
+def reverse_geocode(lat: float, lon: float, max_km: float = 50) -> str | None:
+    """Name of the nearest gazetteer place within max_km of (lat, lon)."""
+    nearest = gazetteer.reverse(lat, lon, max_km)
+    return nearest[0] if nearest else None
 
-    return (None, None)
+
+def geocode_many(places: Iterable[str]) -> dict[str, tuple[float | None, float | None]]:
+    """geocode each distinct place once, e.g. every rule location before a matching pass."""
+    return {place: geocode(place) for place in dict.fromkeys(places)}
+
+
+EARTH_RADIUS_KM = 6371
 
 
 def haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """Calculate distance between two points in km using Haversine formula."""
-    R = 6371  # Earth radius in km
+    R = EARTH_RADIUS_KM
     dlat = math.radians(lat2 - lat1)
     dlon = math.radians(lon2 - lon1)
     a = (math.sin(dlat / 2) ** 2 +
@@ -92,3 +272,66 @@ def haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
          math.sin(dlon / 2) ** 2)
     c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
     return R * c
+
+
+def haversine_many(lat: float, lon: float, lats, lons):
+    """
+    Distances in km from (lat, lon) to every point in lats/lons, in one vectorized pass.
+    Returns an ndarray, or a plain list when NumPy is not installed.
+    """
+    if np is None:
+        return [haversine(lat, lon, plat, plon) for plat, plon in zip(lats, lons)]
+    lats = np.radians(np.asarray(lats, dtype=np.float64))
+    lons = np.radians(np.asarray(lons, dtype=np.float64))
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    a = (np.sin((lats - lat1) / 2) ** 2 +
+         math.cos(lat1) * np.cos(lats) * np.sin((lons - lon1) / 2) ** 2)
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def haversine_matrix(lats1, lons1, lats2, lons2):
+    """
+    Pairwise M x N distance matrix in km between two point sets.
+    Returns an ndarray, or a list of lists when NumPy is not installed.
+    """
+    if np is None:
+        return [haversine_many(lat, lon, lats2, lons2) for lat, lon in zip(lats1, lons1)]
+    lat1 = np.radians(np.asarray(lats1, dtype=np.float64))[:, None]
+    lon1 = np.radians(np.asarray(lons1, dtype=np.float64))[:, None]
+    lat2 = np.radians(np.asarray(lats2, dtype=np.float64))[None, :]
+    lon2 = np.radians(np.asarray(lons2, dtype=np.float64))[None, :]
+    a = (np.sin((lat2 - lat1) / 2) ** 2 +
+         np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def indices_within(distances, km) -> list[int]:
+    """
+    Positions in a haversine_many / haversine_matrix row whose distance is <= km,
+    where km is one limit for all or a sequence with one limit per position.
+    """
+    if np is not None and isinstance(distances, np.ndarray):
+        return np.flatnonzero(distances <= np.asarray(km)).tolist()
+    if isinstance(km, (int, float)):
+        return [i for i, d in enumerate(distances) if d <= km]
+    return [i for i, (d, limit) in enumerate(zip(distances, km)) if d <= limit]
+
+
+def bounding_box(lat: float, lon: float, radius_km: float) -> tuple[float, float, float | None, float | None]:
+    """
+    Lat/lon box that fully contains the circle of radius_km around (lat, lon).
+
+    Returns (min_lat, max_lat, min_lon, max_lon). The longitude bounds are None
+    when the box touches a pole or wraps the antimeridian -- callers should then
+    filter on latitude only.
+    """
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = lat - dlat, lat + dlat
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90.0), min(max_lat, 90.0), None, None
+
+    dlon = math.degrees(math.asin(min(1.0, math.sin(radius_km / EARTH_RADIUS_KM) / math.cos(math.radians(lat)))))
+    min_lon, max_lon = lon - dlon, lon + dlon
+    if min_lon < -180 or max_lon > 180:
+        return min_lat, max_lat, None, None
+    return min_lat, max_lat, min_lon, max_lon
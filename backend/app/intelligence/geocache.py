@@ -0,0 +1,94 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from ..config import get_settings
+
+settings = get_settings()
+
+Coords = tuple[float, float]
+
+
+class GeocodeCache:
+    """
+    Two-tier geocode cache: an in-process LRU in front of a SQLite table, in its own file.
+
+    Entries expire after the TTL they were stored with. A None value is a negative
+    entry -- the place is known not to resolve -- so misses don't go back to the
+    network until it expires. Keys are expected to be normalized by the caller.
+    """
+
+    def __init__(self, path: str, maxsize: int = 4096):
+        self.path = path
+        self.maxsize = maxsize
+        self._memory: OrderedDict[str, tuple[Coords | None, float]] = OrderedDict()
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS geocode_cache (
+                    query      TEXT PRIMARY KEY,
+                    lat        REAL,
+                    lon        REAL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str) -> tuple[bool, Coords | None]:
+        """(found, coords). found with coords None is a cached miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[1] > now:
+                self._memory.move_to_end(key)
+                return True, entry[0]
+
+            row = self._db().execute(
+                "SELECT lat, lon, expires_at FROM geocode_cache WHERE query = ? AND expires_at > ?",
+                (key, now),
+            ).fetchone()
+            if row is None:
+                return False, None
+            lat, lon, expires_at = row
+            coords = (lat, lon) if lat is not None else None
+            self._remember(key, coords, expires_at)
+            return True, coords
+
+    def put(self, key: str, coords: Coords | None, ttl_seconds: float, persist: bool = True):
+        """Cache a lookup result (None for not found). persist=False keeps it in memory only."""
+        expires_at = time.time() + ttl_seconds
+        lat, lon = coords if coords else (None, None)
+        with self._lock:
+            self._remember(key, coords, expires_at)
+            if persist:
+                db = self._db()
+                db.execute(
+                    """INSERT INTO geocode_cache (query, lat, lon, expires_at) VALUES (?, ?, ?, ?)
+                       ON CONFLICT (query) DO UPDATE SET
+                           lat = excluded.lat, lon = excluded.lon, expires_at = excluded.expires_at""",
+                    (key, lat, lon, expires_at),
+                )
+                db.commit()
+
+    def clear(self):
+        """Drop both tiers."""
+        with self._lock:
+            self._memory.clear()
+            db = self._db()
+            db.execute("DELETE FROM geocode_cache")
+            db.commit()
+
+    def _remember(self, key: str, coords: Coords | None, expires_at: float):
+        self._memory[key] = (coords, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+
+geocode_cache = GeocodeCache(settings.GEOCODE_CACHE_PATH, settings.GEOCODE_CACHE_SIZE)
@@ -0,0 +1,31 @@
+from typing import Iterable
+
+try:
+    import ahocorasick
+except ImportError:  # optional -- falls back to one substring test per keyword
+    ahocorasick = None
+
+
+class KeywordMatcher:
+    """
+    A keyword set compiled once into an Aho-Corasick automaton (pyahocorasick).
+
+    scan() reports which keywords occur anywhere in the text as substrings --
+    the same test as `keyword in text`, overlaps included -- in a single pass.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = tuple(dict.fromkeys(k.lower() for k in keywords))
+        self._automaton = None
+        if ahocorasick is not None and self.keywords:
+            self._automaton = ahocorasick.Automaton()
+            for keyword in self.keywords:
+                self._automaton.add_word(keyword, keyword)
+            self._automaton.make_automaton()
+
+    def scan(self, text: str) -> set[str]:
+        """Keywords found in text (matched case-insensitively)."""
+        text = text.lower()
+        if self._automaton is None:
+            return {k for k in self.keywords if k in text}
+        return {keyword for _, keyword in self._automaton.iter(text)}
@@ -1,3 +1,25 @@
+from .keywords import KeywordMatcher
+
+# Hackathon relevance signals
+RELEVANCE_KEYWORDS = ["hackathon", "hack", "build", "code", "dev", "project"]
+
+# Sponsor quality signals
+SPONSOR_SIGNALS = ["mlh", "devfolio", "github", "google", "microsoft",
+                   "aws", "azure", "polygon", "ethereum", "solana"]
+
+# Duration signals (longer events = more food likely)
+LONG_DURATION_SIGNALS = ["48 hour", "36 hour", "3 day", "weekend"]
+SHORT_DURATION_SIGNALS = ["24 hour", "overnight", "2 day"]
+
+# Prize pool signals (well-funded = better food)
+PRIZE_SIGNALS = ["prize pool", "prizes worth", "cash prize"]
+
+KEYWORDS = [*RELEVANCE_KEYWORDS, *SPONSOR_SIGNALS, *LONG_DURATION_SIGNALS,
+            *SHORT_DURATION_SIGNALS, *PRIZE_SIGNALS]
+
+_matcher = KeywordMatcher(KEYWORDS)
+
+
 def compute_score(food_score: int, description: str) -> int:
     """
     Compute combined event relevance score.
@@ -6,28 +28,29 @@ def compute_score(food_score: int, description: str) -> int:
 
     Returns integer score (higher = more relevant).
     """
+    return score_from_hits(food_score, _matcher.scan(description))
+
+
+def score_from_hits(food_score: int, hits: set[str]) -> int:
+    """compute_score on an already-scanned set of keyword hits (see KeywordMatcher)."""
     score = food_score
-    text = description.lower()
 
     # Hackathon relevance signals
-    relevance_keywords = ["hackathon", "hack", "build", "code", "dev", "project"]
-    relevance_hits = sum(1 for k in relevance_keywords if k in text)
+    relevance_hits = sum(1 for k in RELEVANCE_KEYWORDS if k in hits)
     score += min(relevance_hits, 3)  # cap at 3
 
     # Sponsor quality bonus
-    sponsor_signals = ["mlh", "devfolio", "github", "google", "microsoft",
-                       "aws", "azure", "polygon", "ethereum", "solana"]
-    sponsor_hits = sum(1 for s in sponsor_signals if s in text)
+    sponsor_hits = sum(1 for s in SPONSOR_SIGNALS if s in hits)
     score += min(sponsor_hits, 3)  # cap at 3
 
     # Duration bonus (longer events = more food likely)
-    if any(w in text for w in ["48 hour", "36 hour", "3 day", "weekend"]):
+    if any(w in hits for w in LONG_DURATION_SIGNALS):
         score += 2
-    elif any(w in text for w in ["24 hour", "overnight", "2 day"]):
+    elif any(w in hits for w in SHORT_DURATION_SIGNALS):
         score += 1
 
     # Prize pool bonus (well-funded = better food)
-    if any(w in text for w in ["prize pool", "prizes worth", "cash prize"]):
+    if any(w in hits for w in PRIZE_SIGNALS):
         score += 1
 
     return score
@@ -0,0 +1,240 @@
+import heapq
+import math
+import threading
+import time
+from typing import Hashable
+
+from ..background import start_rebuild_loop
+from .geo import haversine, haversine_many, bounding_box, EARTH_RADIUS_KM
+
+KM_PER_DEG = math.pi * EARTH_RADIUS_KM / 180
+
+# cache_versions counter bumped by writes that add, move or unlocate events
+VERSION_NAME = "event_locations"
+
+
+class SpatialIndex:
+    """
+    Uniform lat/lon grid over point coordinates.
+
+    Answers radius and k-nearest queries by visiting only the grid cells that can
+    contain a hit, instead of scanning every point with haversine.
+    """
+
+    def __init__(self, cell_deg: float = 0.5):
+        self.cell_deg = cell_deg
+        self._n_cols = round(360 / cell_deg)
+        self._cells: dict[tuple[int, int], dict[Hashable, tuple[float, float]]] = {}
+        self._points: dict[Hashable, tuple[float, float, tuple[int, int]]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def _cell(self, lat: float, lon: float) -> tuple[int, int]:
+        return (math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg) % self._n_cols)
+
+    def insert(self, key: Hashable, lat: float, lon: float):
+        """Add a point, or move it if the key is already indexed."""
+        with self._lock:
+            self.remove(key)
+            cell = self._cell(lat, lon)
+            self._cells.setdefault(cell, {})[key] = (lat, lon)
+            self._points[key] = (lat, lon, cell)
+
+    def remove(self, key: Hashable):
+        with self._lock:
+            entry = self._points.pop(key, None)
+            if entry is None:
+                return
+            bucket = self._cells[entry[2]]
+            del bucket[key]
+            if not bucket:
+                del self._cells[entry[2]]
+
+    def clear(self):
+        with self._lock:
+            self._cells.clear()
+            self._points.clear()
+
+    def within_radius(self, lat: float, lon: float, km: float) -> list[tuple[Hashable, float]]:
+        """All (key, distance_km) pairs within km of (lat, lon), nearest first."""
+        min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, km)
+        row_lo, row_hi = math.floor(min_lat / self.cell_deg), math.floor(max_lat / self.cell_deg)
+
+        with self._lock:
+            if min_lon is None:
+                cols = None
+            else:
+                col_lo, col_hi = math.floor(min_lon / self.cell_deg), math.floor(max_lon / self.cell_deg)
+                cols = {c % self._n_cols for c in range(col_lo, col_hi + 1)}
+
+            n_candidates = (row_hi - row_lo + 1) * (len(cols) if cols is not None else self._n_cols)
+            if n_candidates < len(self._cells):
+                col_iter = cols if cols is not None else range(self._n_cols)
+                buckets = [self._cells.get((r, c)) for r in range(row_lo, row_hi + 1) for c in col_iter]
+            else:
+                buckets = [
+                    b for (r, c), b in self._cells.items()
+                    if row_lo <= r <= row_hi and (cols is None or c in cols)
+                ]
+
+            keys, lats, lons = [], [], []
+            for bucket in buckets:
+                if not bucket:
+                    continue
+                for key, (plat, plon) in bucket.items():
+                    keys.append(key)
+                    lats.append(plat)
+                    lons.append(plon)
+
+        distances = haversine_many(lat, lon, lats, lons)
+        hits = [(key, float(d)) for key, d in zip(keys, distances) if d <= km]
+        hits.sort(key=lambda h: h[1])
+        return hits
+
+    def nearest(self, lat: float, lon: float, k: int) -> list[tuple[Hashable, float]]:
+        """The k closest (key, distance_km) pairs to (lat, lon), nearest first."""
+        if k <= 0:
+            return []
+        with self._lock:
+            total = len(self._points)
+            if total == 0:
+                return []
+            center_row, center_col = self._cell(lat, lon)
+            best: list[tuple[float, int, Hashable]] = []  # max-heap on -distance
+            seen = 0
+            ring = 0
+            while True:
+                for cell in self._ring_cells(center_row, center_col, ring):
+                    bucket = self._cells.get(cell)
+                    if not bucket:
+                        continue
+                    for key, (plat, plon) in bucket.items():
+                        seen += 1
+                        d = haversine(lat, lon, plat, plon)
+                        if len(best) < k:
+                            heapq.heappush(best, (-d, seen, key))
+                        elif d < -best[0][0]:
+                            heapq.heapreplace(best, (-d, seen, key))
+
+                if seen >= total:
+                    break
+                if len(best) == k and -best[0][0] <= self._ring_clearance_km(lat, ring):
+                    break
+                ring += 1
+
+        return sorted(((key, -neg_d) for neg_d, _, key in best), key=lambda h: h[1])
+
+    def _ring_cells(self, row: int, col: int, ring: int):
+        """Cells on the square ring at Chebyshev distance `ring` around (row, col)."""
+        if ring == 0:
+            yield (row, col)
+            return
+        span = min(ring, self._n_cols // 2)
+        cols = {(col + dc) % self._n_cols for dc in range(-span, span + 1)}
+        for r in (row - ring, row + ring):
+            for c in cols:
+                yield (r, c)
+        if ring <= self._n_cols // 2:
+            side_cols = {(col - ring) % self._n_cols, (col + ring) % self._n_cols}
+            for r in range(row - ring + 1, row + ring):
+                for c in side_cols:
+                    yield (r, c)
+
+    def _ring_clearance_km(self, lat: float, ring: int) -> float:
+        """Lower bound on the distance from a point to any cell outside the first `ring` rings."""
+        reach_deg = ring * self.cell_deg
+        lat_clearance = reach_deg * KM_PER_DEG
+        edge_lat = min(90.0, abs(lat) + reach_deg + self.cell_deg)
+        lon_clearance = reach_deg * KM_PER_DEG * math.cos(math.radians(edge_lat))
+        return min(lat_clearance, lon_clearance)
+
+
+class EventIndex(SpatialIndex):
+    """
+    SpatialIndex over Event.lat/lon keyed by event id, rebuilt from the DB.
+
+    Other processes write events too, so the grid remembers the event_locations
+    version (cache_versions) it was built at; callers only trust it while
+    current() says it has caught up.
+    """
+
+    def __init__(self, cell_deg: float = 0.5):
+        super().__init__(cell_deg)
+        self.ready = False
+        self.built_at = 0.0
+        self.version: int | None = None
+        self.stale = threading.Event()  # set to ask the refresh thread for an early rebuild
+        self._polled = None
+
+    def build(self, db):
+        """Load every geocoded event. Swaps the grid in atomically once loaded."""
+        from .. import models
+        from ..cache import data_version
+
+        # Read before the rows: anything committed after this shows up as a newer version
+        version = data_version(db, VERSION_NAME)
+        fresh = SpatialIndex(self.cell_deg)
+        rows = (
+            db.query(models.Event.id, models.Event.lat, models.Event.lon)
+            .filter(models.Event.lat.isnot(None), models.Event.lon.isnot(None))
+            .yield_per(10_000)
+        )
+        for event_id, lat, lon in rows:
+            fresh.insert(event_id, lat, lon)
+
+        with self._lock:
+            self._cells, self._points = fresh._cells, fresh._points
+            self.ready = True
+            self.built_at = time.monotonic()
+            self.version = version
+        print(f"  [spatial] Indexed {len(self)} events")
+
+    def current(self, db) -> bool:
+        """
+        Whether the grid reflects every coordinate change committed so far (as of
+        the last version poll). If not, asks for a rebuild.
+        """
+        if self._polled is None:
+            from ..cache import PolledVersion
+            from ..config import get_settings
+
+            self._polled = PolledVersion(VERSION_NAME, get_settings().CACHE_VERSION_POLL_SECONDS)
+        if self.ready and self.version is not None and self.version >= self._polled.get(db):
+            return True
+        self.stale.set()
+        return False
+
+    def update(self, points: list[tuple[Hashable, float | None, float | None]]):
+        """Apply (event_id, lat, lon) changes to the grid."""
+        with self._lock:
+            for event_id, lat, lon in points:
+                if lat is None or lon is None:
+                    self.remove(event_id)
+                else:
+                    self.insert(event_id, lat, lon)
+
+    def committed(self, db, points: list[tuple[Hashable, float | None, float | None]]):
+        """
+        Apply coordinate changes this process has just committed and bump the
+        shared version so other processes rebuild. If nothing else moved since
+        this grid was last current, it stays current without a rebuild.
+        """
+        from ..cache import bump_version
+
+        version = bump_version(db, VERSION_NAME)
+        with self._lock:
+            self.update(points)
+            if self.version == version - 1:
+                self.version = version
+        if self._polled is not None:
+            self._polled.reset()
+
+
+event_index = EventIndex()
+
+
+def start_event_index(session_factory, refresh_seconds: int):
+    """Keep event_index built; a search that finds it behind the data version triggers an early rebuild."""
+    return start_rebuild_loop("spatial", event_index.build, session_factory, refresh_seconds, wake=event_index.stale)
@@ -0,0 +1,50 @@
+from dataclasses import dataclass
+
+from . import detector, geo, scorer
+from .keywords import KeywordMatcher
+
+# Every keyword the description-level signals look for, compiled into one automaton
+_matcher = KeywordMatcher([*detector.KEYWORDS, *scorer.KEYWORDS, *geo.EVENT_TYPE_KEYWORDS])
+
+
+@dataclass(frozen=True)
+class TextSignals:
+    """Everything the intelligence stage reads off an event description."""
+    hits: frozenset[str]
+    food_detected: bool
+    food_keywords: list[str]
+    food_score: int
+    relevance_score: int
+    event_type: str
+
+    @property
+    def relevance_hits(self) -> list[str]:
+        return [k for k in scorer.RELEVANCE_KEYWORDS if k in self.hits]
+
+    @property
+    def sponsor_hits(self) -> list[str]:
+        return [s for s in scorer.SPONSOR_SIGNALS if s in self.hits]
+
+    @property
+    def duration_signals(self) -> list[str]:
+        return [s for s in dict.fromkeys(detector.DURATION_SIGNALS + scorer.LONG_DURATION_SIGNALS
+                                         + scorer.SHORT_DURATION_SIGNALS) if s in self.hits]
+
+
+def analyze_text(text: str) -> TextSignals:
+    """
+    detect_food, compute_score and detect_event_type from a single scan of the text.
+
+    Same results as calling the three separately, which each lowercase and
+    search the text on their own.
+    """
+    hits = _matcher.scan(text)
+    food_detected, food_keywords, food_score = detector.food_from_hits(hits)
+    return TextSignals(
+        hits=frozenset(hits),
+        food_detected=food_detected,
+        food_keywords=food_keywords,
+        food_score=food_score,
+        relevance_score=scorer.score_from_hits(food_score, hits),
+        event_type=geo.event_type_from_hits(hits),
+    )
@@ -1,25 +1,61 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Depends
+from uuid import UUID
+from fastapi import FastAPI, Depends, BackgroundTasks, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 
-from .database import init_db, get_db
+from . import models, schemas
+from .config import get_settings
+from .database import init_db, get_db, SessionLocal
 from .auth.router import router as auth_router
 from .auth.utils import get_current_user
 from .events.router import router as events_router
 from .notifications.router import router as notifications_router
 from .analytics.router import router as analytics_router
+from .analytics.rollups import ensure_rollups
 from .activity.router import router as activity_router
-from .ingestion.runner import run_ingestion
-from .notifications.engine import match_and_notify
+from .ingestion.jobs import enqueue_ingestion, job_workers
+from .ingestion.scheduler import ingestion_scheduler
+from .ingestion.rescore import claim_rescore, rescore_events
+from .intelligence.spatial import start_event_index
+from .ingestion.browser import browser_pool
+from .notifications.digest import digest_flusher
+from .notifications.dispatcher import dispatcher
+from .notifications.subscriptions import start_subscription_index
+
+settings = get_settings()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Startup: init DB tables."""
+    """
+    Startup: init DB tables (and the analytics rollups on first run), build the
+    event and subscription indexes, launch the scraper browser, the notification
+    dispatcher and digest flusher, the ingestion job workers and the ingestion
+    scheduler.
+    """
     init_db()
     print("  [startup] Database initialized")
+    with SessionLocal() as db:
+        ensure_rollups(db)
+    start_event_index(SessionLocal, settings.SPATIAL_INDEX_REFRESH_SECONDS)
+    start_subscription_index(SessionLocal, settings.SUBSCRIPTION_INDEX_REFRESH_SECONDS)
+    try:
+        browser_pool.start()
+    except Exception as e:
+        # Devfolio retries the launch on its next run
+        print(f"  [startup] Browser pool unavailable: {e}")
+    dispatcher.start()
+    digest_flusher.start()
+    job_workers.start(settings.INGEST_WORKERS)
+    if settings.SCHEDULER_ENABLED:
+        ingestion_scheduler.start()
     yield
+    ingestion_scheduler.stop()
+    job_workers.stop()
+    digest_flusher.stop()
+    dispatcher.stop()
+    browser_pool.stop()
 
 
 app = FastAPI(
@@ -36,6 +72,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # keyset pagination token on list endpoints
 )
 
 # Routers
@@ -51,20 +88,65 @@ def root():
     return {"service": "HackPlate API", "version": "3.0.0", "status": "running"}
 
 
-@app.post("/ingest", tags=["ingestion"])
+@app.post("/ingest", status_code=202, tags=["ingestion"])
 def trigger_ingestion(
     limit: int = 10,
+    source: list[str] | None = Query(None),
     db: Session = Depends(get_db),
     user=Depends(get_current_user),  # Enforce auth
 ):
     """
-    Trigger a manual ingestion run. Requires authentication.
-    Scrapes all sources, scores, deduplicates, stores, and notifies.
+    Queue an ingestion run and return its job id. Requires authentication.
+    The job scrapes the sources (all by default), scores, deduplicates, stores and
+    notifies in the background; poll GET /ingest/{job_id} for its progress.
+    Sources already queued or running in another job aren't queued twice.
     """
+    if not user:
+        raise HTTPException(status_code=401, detail="Unauthorized")
     safe_limit = max(1, min(limit, 50))  # Bound limit to 50 max
-    new_events = run_ingestion(db, limit=safe_limit)
-    match_and_notify(db, new_events)
+    try:
+        job, deduplicated = enqueue_ingestion(db, sources=source, limit=safe_limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return {
-        "message": f"Ingestion complete. {len(new_events)} new events stored.",
-        "new_events": len(new_events),
+        "message": f"Ingestion job {job.status}.",
+        "job_id": job.id,
+        "status": job.status,
+        "sources": job.sources,
+        "deduplicated": deduplicated,
     }
+
+
+@app.get("/ingest/{job_id}", response_model=schemas.IngestionJobResponse, tags=["ingestion"])
+def get_ingestion_job(
+    job_id: UUID,
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Status, per-stage timings and outcome of an ingestion job. Requires authentication."""
+    if not user:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    job = db.get(models.IngestionJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Ingestion job not found")
+    return job
+
+
+@app.post("/rescore", status_code=202, tags=["ingestion"])
+def trigger_rescore(
+    background_tasks: BackgroundTasks,
+    user=Depends(get_current_user),  # Enforce auth
+):
+    """
+    Recompute food/relevance/total scores, confidence and keywords for every stored
+    event from its description, e.g. after tuning SCORING. Requires authentication.
+    Runs in the background; progress goes to the server log.
+    """
+    if not user:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    holder = claim_rescore()  # a DB lease, so a rescore running in another process counts too
+    if holder is None:
+        raise HTTPException(status_code=409, detail="A rescore is already running")
+
+    background_tasks.add_task(rescore_events, holder=holder)
+    return {"message": "Rescore started."}
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text, JSON, Uuid
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text, JSON, Uuid, Index, func
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .database import Base
@@ -37,10 +37,18 @@ class Event(Base):
     source = Column(String(100), default="unknown")
     keywords = Column(JSON, default=list)
     start_date = Column(String(100), nullable=True)
+    content_hash = Column(String(64), nullable=True)  # sha256 of the scraped fields, skips no-op upserts
     created_at = Column(DateTime, default=datetime.utcnow)
 
     saved_by = relationship("SavedEvent", back_populates="event")
 
+    # Keyset pagination: ORDER BY score DESC, id seeks straight to the cursor.
+    # Same expression as events.service.sort_key -- NULL scores rank as 0.
+    __table_args__ = (
+        Index("ix_events_relevance_sort", func.coalesce(relevance_score, 0).desc(), id),
+        Index("ix_events_total_sort", func.coalesce(total_score, 0).desc(), id),
+    )
+
 
 class NotificationRule(Base):
     __tablename__ = "notification_rules"
@@ -61,7 +69,7 @@ class SavedEvent(Base):
     __tablename__ = "saved_events"
 
     id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
     event_id = Column(Uuid(as_uuid=True), ForeignKey("events.id"), nullable=False)
     saved_at = Column(DateTime, default=datetime.utcnow)
 
@@ -95,3 +103,70 @@ class NotificationPreference(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
     user = relationship("User", back_populates="notification_preferences")
+
+
+class IngestionJob(Base):
+    __tablename__ = "ingestion_jobs"
+
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    status = Column(String(20), default="queued", index=True)  # queued / running / done / failed
+    sources = Column(JSON, default=list)  # scraper names this job runs
+    limit = Column(Integer, default=10)
+    trigger = Column(String(50), default="api")  # api / schedule
+    stages = Column(JSON, default=dict)  # stage -> seconds
+    result = Column(JSON, nullable=True)  # IngestionReport summary
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)  # refreshed while running; stale = worker died
+    finished_at = Column(DateTime, nullable=True)
+
+
+class SchedulerLease(Base):
+    __tablename__ = "scheduler_leases"
+
+    name = Column(String(100), primary_key=True)
+    holder = Column(String(200), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+
+class OutboxMessage(Base):
+    __tablename__ = "notification_outbox"
+
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    channel = Column(String(50), nullable=False, index=True)  # telegram / email
+    recipient = Column(String(320), nullable=False)  # chat id or email address
+    subject = Column(String(500), default="")
+    body = Column(Text, nullable=False)
+    status = Column(String(20), default="pending", index=True)  # pending / sending / sent / failed
+    attempts = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, index=True)  # while sending: claim expiry
+    claimed_by = Column(String(64), nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+
+
+class DigestEntry(Base):
+    __tablename__ = "notification_digest_pending"  # matches held for a daily / weekly digest
+
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    event_id = Column(Uuid(as_uuid=True), ForeignKey("events.id"), primary_key=True)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class CacheVersion(Base):
+    __tablename__ = "cache_versions"  # bumped by writers; part of every response cache key
+
+    name = Column(String(100), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+
+class EventRollup(Base):
+    __tablename__ = "event_rollups"  # event counts per day / source / city, kept current by ingestion
+    __table_args__ = (Index("ix_event_rollups_dimension_events", "dimension", "events"),)
+
+    dimension = Column(String(20), primary_key=True)  # total / day / source / city
+    key = Column(String(200), primary_key=True)  # "" for total, YYYY-MM-DD for day
+    events = Column(Integer, nullable=False, default=0)
+    food_events = Column(Integer, nullable=False, default=0)  # food_score > 0
@@ -0,0 +1,154 @@
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..background import LeasedLoop
+from ..config import get_settings
+from ..database import upsert_insert
+from . import email, telegram
+from .dispatcher import dispatcher, enqueue_message
+
+settings = get_settings()
+
+LEASE_NAME = "digest-flush"
+
+# NotificationPreference.frequency values that batch matches; anything else is sent instantly
+DIGEST_PERIODS = {
+    "daily": timedelta(days=1),
+    "weekly": timedelta(days=7),
+}
+
+# Users flushed per round of queries
+FLUSH_CHUNK = 500
+
+
+def queue_digest(db: Session, pairs: list[tuple[uuid.UUID, uuid.UUID]]):
+    """Hold (user_id, event_id) matches for the user's next digest. Duplicates are ignored. Does not commit."""
+    if not pairs:
+        return
+    now = datetime.utcnow()
+    db.execute(
+        upsert_insert(db, models.DigestEntry).on_conflict_do_nothing(),
+        [{"user_id": user_id, "event_id": event_id, "created_at": now} for user_id, event_id in set(pairs)],
+    )
+
+
+def due_users(db: Session, now: datetime) -> list[tuple[uuid.UUID, str]]:
+    """
+    (user_id, frequency) for users whose oldest held match is a full period old.
+    Users who switched back to instant (or lost their preferences) are due at once.
+    """
+    rows = (
+        db.query(models.DigestEntry.user_id, models.NotificationPreference.frequency,
+                 func.min(models.DigestEntry.created_at))
+        .outerjoin(models.NotificationPreference,
+                   models.NotificationPreference.user_id == models.DigestEntry.user_id)
+        .group_by(models.DigestEntry.user_id, models.NotificationPreference.frequency)
+        .all()
+    )
+    return [
+        (user_id, frequency or "instant")
+        for user_id, frequency, oldest in rows
+        if oldest <= now - DIGEST_PERIODS.get(frequency, timedelta(0))
+    ]
+
+
+def flush_digests(db: Session, now: datetime | None = None) -> int:
+    """
+    Queue one digest message per due user and enabled channel, then drop their
+    held matches. A fixed number of queries per FLUSH_CHUNK users. Returns the
+    number of messages queued.
+    """
+    now = now or datetime.utcnow()
+    due = due_users(db, now)
+    queued = 0
+    for i in range(0, len(due), FLUSH_CHUNK):
+        chunk = dict(due[i:i + FLUSH_CHUNK])
+        user_ids = list(chunk)
+
+        events: dict[uuid.UUID, list] = {}
+        rows = (
+            db.query(models.DigestEntry.user_id, models.Event.title, models.Event.url, models.Event.city,
+                     models.Event.event_type, models.Event.relevance_score, models.Event.food_score)
+            .join(models.Event, models.Event.id == models.DigestEntry.event_id)
+            .filter(models.DigestEntry.user_id.in_(user_ids), models.DigestEntry.created_at <= now)
+            .order_by(models.Event.relevance_score.desc(), models.Event.title)
+        )
+        for row in rows:
+            events.setdefault(row.user_id, []).append(row)
+
+        prefs = (
+            db.query(models.NotificationPreference.user_id, models.NotificationPreference.telegram_enabled,
+                     models.NotificationPreference.email_enabled, models.User.email)
+            .join(models.User, models.User.id == models.NotificationPreference.user_id)
+            .filter(models.NotificationPreference.user_id.in_(user_ids))
+        )
+        for user_id, telegram_enabled, email_enabled, user_email in prefs:
+            if user_id not in events:
+                continue
+            queued += _queue_digest_messages(
+                db, chunk[user_id], events[user_id], telegram_enabled, email_enabled and user_email,
+            )
+
+        db.execute(delete(models.DigestEntry).where(
+            models.DigestEntry.user_id.in_(user_ids), models.DigestEntry.created_at <= now,
+        ))
+        db.commit()
+
+    if queued:
+        print(f"  [digest] Queued {queued} digests for {len(due)} users")
+        dispatcher.wake()
+    return queued
+
+
+def _queue_digest_messages(db: Session, frequency: str, events: list, telegram_enabled: bool, to: str | None) -> int:
+    label = frequency if frequency in DIGEST_PERIODS else "new"
+    heading = f"HackPlate {label} digest: {len(events)} new event{'s' if len(events) != 1 else ''}"
+    queued = 0
+    if telegram_enabled:
+        if telegram.configured():
+            enqueue_message(db, "telegram", settings.TELEGRAM_CHAT_ID, telegram.format_digest(heading, events))
+            queued += 1
+        else:
+            print("  [telegram] Not configured -- skipping")
+    if to:
+        body = _digest_email_body(events)
+        if email.configured():
+            enqueue_message(db, "email", to, body, subject=heading)
+            queued += 1
+        else:
+            email.log_unsent(to, heading, body)
+    return queued
+
+
+def _digest_email_body(events: list) -> str:
+    lines = []
+    for event in events:
+        food_text = "🍕 Food available" if event.food_score > 0 else "No food info"
+        lines.append(
+            f"{event.title}\n"
+            f"City: {event.city} | Type: {event.event_type} | Score: {event.relevance_score} | {food_text}\n"
+            f"View: {event.url}"
+        )
+    return "\n\n".join(lines)
+
+
+class DigestFlusher(LeasedLoop):
+    """
+    Sends due digests every DIGEST_FLUSH_SECONDS. Every API process runs one;
+    a DB lease keeps it to a single process at a time.
+    """
+
+    tag = "digest"
+
+    def __init__(self):
+        super().__init__(LEASE_NAME, settings.DIGEST_FLUSH_SECONDS, 2 * settings.DIGEST_FLUSH_SECONDS)
+
+    def tick(self, db):
+        flush_digests(db)
+
+
+digest_flusher = DigestFlusher()
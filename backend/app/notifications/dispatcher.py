@@ -0,0 +1,274 @@
+import asyncio
+import random
+import smtplib
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+import httpx
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..config import get_settings
+from ..database import SessionLocal
+from . import email, telegram
+
+settings = get_settings()
+
+# How long a claimed batch stays reserved; a dispatcher that dies mid-send releases it this late
+CLAIM_SECONDS = 300
+
+
+@dataclass
+class Outgoing:
+    """Snapshot of an outbox row handed to a channel (no ORM objects cross threads)."""
+    id: uuid.UUID
+    recipient: str
+    subject: str
+    body: str
+
+
+class DeliveryError(Exception):
+    """A send that failed. permanent: don't retry. retry_after: server-requested delay in seconds."""
+
+    def __init__(self, message: str, permanent: bool = False, retry_after: float | None = None):
+        super().__init__(message)
+        self.permanent = permanent
+        self.retry_after = retry_after
+
+
+def enqueue_message(
+    db: Session,
+    channel: str,
+    recipient: str,
+    body: str,
+    subject: str = "",
+) -> models.OutboxMessage:
+    """Add a message to the outbox. Delivered by the dispatcher once the caller commits."""
+    message = models.OutboxMessage(
+        channel=channel, recipient=recipient, subject=subject, body=body,
+        status="pending", attempts=0, next_attempt_at=datetime.utcnow(),
+    )
+    db.add(message)
+    return message
+
+
+class TelegramChannel:
+    """Bot API sends over one pooled keep-alive client, a few messages in flight at a time."""
+
+    name = "telegram"
+
+    def __init__(self):
+        self._client: httpx.AsyncClient | None = None
+
+    async def send_batch(self, batch: list[Outgoing]) -> dict[uuid.UUID, DeliveryError | None]:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=f"{settings.TELEGRAM_API_URL}/bot{settings.TELEGRAM_BOT_TOKEN}",
+                timeout=10,
+                limits=httpx.Limits(max_connections=settings.TELEGRAM_CONCURRENCY),
+            )
+        semaphore = asyncio.Semaphore(settings.TELEGRAM_CONCURRENCY)
+
+        async def send(message: Outgoing) -> DeliveryError | None:
+            async with semaphore:
+                try:
+                    resp = await self._client.post(
+                        "/sendMessage", json=telegram.message_payload(message.recipient, message.body),
+                    )
+                except httpx.HTTPError as e:
+                    return DeliveryError(f"{type(e).__name__}: {e}")
+            if resp.status_code == 200:
+                return None
+            retry_after = None
+            if resp.status_code == 429:
+                try:
+                    retry_after = float(resp.json()["parameters"]["retry_after"])
+                except (ValueError, KeyError, TypeError):
+                    pass
+            permanent = 400 <= resp.status_code < 500 and resp.status_code not in (408, 429)
+            return DeliveryError(f"HTTP {resp.status_code}: {resp.text[:200]}", permanent, retry_after)
+
+        results = await asyncio.gather(*(send(message) for message in batch))
+        return {message.id: result for message, result in zip(batch, results)}
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class EmailChannel:
+    """Sends a whole batch over one SMTP connection: one connect, STARTTLS and login per batch."""
+
+    name = "email"
+
+    async def send_batch(self, batch: list[Outgoing]) -> dict[uuid.UUID, DeliveryError | None]:
+        # smtplib is blocking; keep it off the dispatcher loop
+        return await asyncio.to_thread(self._send_batch, batch)
+
+    def _send_batch(self, batch: list[Outgoing]) -> dict[uuid.UUID, DeliveryError | None]:
+        results: dict[uuid.UUID, DeliveryError | None] = {}
+        try:
+            with email.connect() as server:
+                for message in batch:
+                    try:
+                        server.send_message(email.build_message(message.recipient, message.subject, message.body))
+                        results[message.id] = None
+                    except smtplib.SMTPRecipientsRefused as e:
+                        results[message.id] = DeliveryError(str(e), permanent=True)
+                    except smtplib.SMTPServerDisconnected:
+                        raise
+                    except smtplib.SMTPResponseException as e:
+                        results[message.id] = DeliveryError(str(e), permanent=500 <= e.smtp_code < 600)
+        except Exception as e:
+            # Connect / login failed or the server hung up: everything not yet sent retries
+            for message in batch:
+                results.setdefault(message.id, DeliveryError(f"{type(e).__name__}: {e}"))
+        return results
+
+    async def close(self):
+        pass
+
+
+def claim_batch(channel: str, limit: int, claimer: str) -> list[Outgoing]:
+    """Reserve up to limit due messages for one channel (due retries, expired claims included)."""
+    now = datetime.utcnow()
+    due = [
+        models.OutboxMessage.channel == channel,
+        models.OutboxMessage.status.in_(("pending", "sending")),
+        models.OutboxMessage.next_attempt_at <= now,
+    ]
+    with SessionLocal() as db:
+        ids = [row.id for row in db.query(models.OutboxMessage.id).filter(*due)
+               .order_by(models.OutboxMessage.next_attempt_at).limit(limit)]
+        if not ids:
+            return []
+        # Tag the rows in one conditional UPDATE, then read back only those we won
+        db.execute(
+            update(models.OutboxMessage)
+            .where(models.OutboxMessage.id.in_(ids), *due)
+            .values(status="sending", claimed_by=claimer, attempts=models.OutboxMessage.attempts + 1,
+                    next_attempt_at=now + timedelta(seconds=CLAIM_SECONDS))
+        )
+        db.commit()
+        rows = db.query(models.OutboxMessage).filter(
+            models.OutboxMessage.id.in_(ids), models.OutboxMessage.claimed_by == claimer,
+            models.OutboxMessage.status == "sending",
+        ).all()
+        return [Outgoing(row.id, row.recipient, row.subject or "", row.body) for row in rows]
+
+
+def record_results(results: dict[uuid.UUID, DeliveryError | None]) -> tuple[int, int, int]:
+    """Mark sent messages, and reschedule failures with exponential backoff. Returns (sent, retrying, failed)."""
+    now = datetime.utcnow()
+    sent = retrying = failed = 0
+    with SessionLocal() as db:
+        for message in db.query(models.OutboxMessage).filter(models.OutboxMessage.id.in_(list(results))):
+            error = results[message.id]
+            message.claimed_by = None
+            if error is None:
+                message.status, message.sent_at, message.last_error = "sent", now, None
+                sent += 1
+            elif error.permanent or message.attempts >= settings.NOTIFY_MAX_ATTEMPTS:
+                message.status, message.last_error = "failed", str(error)
+                failed += 1
+            else:
+                delay = settings.NOTIFY_RETRY_BASE_SECONDS * 2 ** (message.attempts - 1) * random.uniform(0.8, 1.2)
+                delay = max(delay, error.retry_after or 0)
+                message.status, message.last_error = "pending", str(error)
+                message.next_attempt_at = now + timedelta(seconds=delay)
+                retrying += 1
+        db.commit()
+    return sent, retrying, failed
+
+
+class Dispatcher:
+    """
+    Delivers the notification outbox in the background: one asyncio worker per
+    channel on a dedicated loop thread, so a slow SMTP server only delays email.
+    Workers claim batches of due messages, send them, and record the outcome;
+    failures retry with exponential backoff up to NOTIFY_MAX_ATTEMPTS. The outbox
+    is a DB table, so queued messages survive restarts.
+    """
+
+    def __init__(self, channels=None):
+        self.channels = channels or [TelegramChannel(), EmailChannel()]
+        self.claimer = uuid.uuid4().hex
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._wakeups: dict[str, asyncio.Event] = {}
+        self._tasks: list[asyncio.Task] = []
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None and self._loop.is_running()
+
+    def start(self):
+        """Start the loop thread and one worker per channel. No-op if already running."""
+        with self._lock:
+            if self.running:
+                return
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="notify-dispatcher", daemon=True)
+            thread.start()
+            asyncio.run_coroutine_threadsafe(self._start_workers(), loop).result()
+            self._loop, self._thread = loop, thread
+            print(f"  [dispatch] Started ({', '.join(c.name for c in self.channels)})")
+
+    def stop(self):
+        """Cancel the workers; claimed-but-unsent messages are picked up again once their claim expires."""
+        with self._lock:
+            if not self.running:
+                return
+            asyncio.run_coroutine_threadsafe(self._stop_workers(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop, self._thread = None, None
+            print("  [dispatch] Stopped")
+
+    def wake(self):
+        """Tell idle workers new messages were committed. Safe from any thread; no-op when stopped."""
+        if self.running:
+            for event in self._wakeups.values():
+                self._loop.call_soon_threadsafe(event.set)
+
+    async def _start_workers(self):
+        for channel in self.channels:
+            self._wakeups[channel.name] = asyncio.Event()
+            self._tasks.append(asyncio.create_task(self._work(channel)))
+
+    async def _stop_workers(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for channel in self.channels:
+            await channel.close()
+
+    async def _work(self, channel):
+        wakeup = self._wakeups[channel.name]
+        while True:
+            try:
+                batch = await asyncio.to_thread(claim_batch, channel.name, settings.NOTIFY_BATCH_SIZE, self.claimer)
+            except Exception as e:
+                print(f"  [dispatch] {channel.name}: claim failed: {e}")
+                batch = []
+            if not batch:
+                try:
+                    await asyncio.wait_for(wakeup.wait(), settings.NOTIFY_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                wakeup.clear()
+                continue
+
+            results = await channel.send_batch(batch)
+            sent, retrying, failed = await asyncio.to_thread(record_results, results)
+            print(f"  [dispatch] {channel.name}: {sent} sent, {retrying} to retry, {failed} failed")
+
+
+dispatcher = Dispatcher()
@@ -1,15 +1,29 @@
-from sqlalchemy.orm import Session
+import uuid
+from dataclasses import dataclass, replace
+
+from sqlalchemy.orm import Session, joinedload
 from .. import models
-from ..intelligence.geo import geocode, haversine
-from .telegram import send_telegram
-from .email import send_email
+from ..config import get_settings
+from . import email, telegram
+from .digest import DIGEST_PERIODS, queue_digest
+from .dispatcher import dispatcher, enqueue_message
+from .subscriptions import Subscription, subscription_index
+
+settings = get_settings()
 
 
 def match_and_notify(db: Session, new_events: list[models.Event]):
     """
     Notify users about new events based on:
     1. NotificationRules (location-based alert rules)
-    2. NotificationPreferences (global telegram/email toggles from Settings)
+    2. NotificationPreferences (global telegram/email toggles from Settings);
+       daily / weekly users get their matches held for the digest flush
+
+    Each event is checked only against the rules and saved searches the
+    subscription index lists as candidates (rebuilt first if they changed in
+    any process); preferences are read with one eager-loaded query.
+
+    Messages go to the outbox and are committed here; the dispatcher sends them.
     """
     if not new_events:
         print("  [notify] No new events to notify about")
@@ -17,112 +31,153 @@ def match_and_notify(db: Session, new_events: list[models.Event]):
 
     print(f"  [notify] Processing {len(new_events)} new events for notifications")
 
+    subscription_index.sync(db)
+    hits = subscription_index.match(new_events)
+
     # ── 1. Rule-based notifications (legacy per-rule system) ──
-    rules = db.query(models.NotificationRule).all()
-    for event in new_events:
-        for rule in rules:
-            if _matches(event, rule):
-                try:
-                    _dispatch_rule(event, rule)
-                except Exception as e:
-                    print(f"  [notify] Rule dispatch failed: {e}")
+    for rule in _load_rules(db, [key[1] for key in hits if key[0] == "rule"]):
+        for i in hits[("rule", rule.id)]:
+            _dispatch_rule(db, new_events[i], rule)
 
     # ── 2. Preference-based notifications (Settings toggles) ──
+    held: list[tuple[uuid.UUID, uuid.UUID]] = []
+    for sub in load_subscribers(db):
+        if not sub.telegram_enabled and not sub.email_enabled:
+            print(f"  [notify] User {sub.user_id}: both channels disabled, skipping")
+            continue
+        print(f"  [notify] User {sub.user_id}: telegram={sub.telegram_enabled}, email={sub.email_enabled}")
+
+        if not sub.has_search:
+            matched = new_events
+        elif ("search", sub.user_id) in subscription_index:
+            matched = [new_events[i] for i in hits.get(("search", sub.user_id), [])]
+        else:
+            # Saved (in any process) after the index was synced above
+            matched = _subscriber_matches(sub, new_events)
+
+        if sub.frequency in DIGEST_PERIODS:
+            held.extend((sub.user_id, event.id) for event in matched)
+            continue
+
+        for event in matched:
+            if sub.telegram_enabled:
+                _queue_telegram(db, event)
+            if sub.email_enabled and sub.email:
+                _queue_email(db, sub.email, f"HackPlate: {event.title}", _event_email_body(event))
+
+    if held:
+        print(f"  [notify] Held {len(held)} matches for digests")
+        queue_digest(db, held)
+
+    db.commit()
+    dispatcher.wake()
+
+
+@dataclass(frozen=True)
+class Subscriber:
+    """A notification preference flattened with its user's email and saved search."""
+    user_id: uuid.UUID
+    email: str | None
+    frequency: str
+    telegram_enabled: bool
+    email_enabled: bool
+    has_search: bool = False
+    latitude: float | None = None
+    longitude: float | None = None
+    radius_km: int = 50
+    min_score: int = 0
+    food_required: bool = False
+
+
+def load_subscribers(db: Session) -> list[Subscriber]:
+    """Every preference with its user and saved search, from a single joined query."""
     prefs = (
         db.query(models.NotificationPreference)
-        .join(models.User, models.User.id == models.NotificationPreference.user_id)
+        .options(
+            joinedload(models.NotificationPreference.user, innerjoin=True)
+            .joinedload(models.User.saved_searches)
+        )
         .all()
     )
-
+    subscribers = []
     for pref in prefs:
-        if not pref.telegram_enabled and not pref.email_enabled:
-            print(f"  [notify] User {pref.user_id}: both channels disabled, skipping")
-            continue
-        print(f"  [notify] User {pref.user_id}: telegram={pref.telegram_enabled}, email={pref.email_enabled}")
+        search = pref.user.saved_searches[0] if pref.user.saved_searches else None
+        sub = Subscriber(
+            user_id=pref.user_id, email=pref.user.email, frequency=pref.frequency or "instant",
+            telegram_enabled=bool(pref.telegram_enabled), email_enabled=bool(pref.email_enabled),
+        )
+        if search:
+            sub = replace(
+                sub, has_search=True, latitude=search.latitude, longitude=search.longitude,
+                radius_km=search.radius_km, min_score=search.min_score, food_required=bool(search.food_required),
+            )
+        subscribers.append(sub)
+    return subscribers
+
+
+def _subscriber_matches(sub: Subscriber, events: list[models.Event]) -> list[models.Event]:
+    """Events matching a subscriber's saved search, without the index."""
+    search = Subscription(
+        key=("search", sub.user_id), min_score=sub.min_score or 0, food_required=sub.food_required,
+        lat=sub.latitude, lon=sub.longitude, radius_km=sub.radius_km or 0,
+    )
+    return [event for event in events if search.matches(event)]
 
-        # Get user's saved search to filter events by location
-        saved_search = (
-            db.query(models.SavedSearch)
-            .filter(models.SavedSearch.user_id == pref.user_id)
-            .first()
+
+def _load_rules(db: Session, rule_ids: list, chunk: int = 500) -> list[models.NotificationRule]:
+    """Matched rules with their users, in a few IN (...) queries."""
+    rules = []
+    for i in range(0, len(rule_ids), chunk):
+        rules.extend(
+            db.query(models.NotificationRule)
+            .options(joinedload(models.NotificationRule.user))
+            .filter(models.NotificationRule.id.in_(rule_ids[i:i + chunk]))
+            .all()
         )
+    return rules
 
-        for event in new_events:
-            # If user has a saved search, check if event matches
-            if saved_search:
-                if event.relevance_score < saved_search.min_score:
-                    continue
-                if saved_search.food_required and event.food_score == 0:
-                    continue
-                if saved_search.latitude and saved_search.longitude and event.lat and event.lon:
-                    dist = haversine(saved_search.latitude, saved_search.longitude, event.lat, event.lon)
-                    if dist > saved_search.radius_km:
-                        continue
-
-            # Send via enabled channels
-            user = db.query(models.User).filter(models.User.id == pref.user_id).first()
-
-            if pref.telegram_enabled:
-                keywords = event.keywords if isinstance(event.keywords, list) else []
-                send_telegram(
-                    title=event.title, url=event.url, city=event.city,
-                    event_type=event.event_type, score=event.relevance_score,
-                    keywords=keywords,
-                )
-
-            if pref.email_enabled and user and user.email:
-                food_text = "🍕 Food available" if event.food_score > 0 else "No food info"
-                body = (
-                    f"New event discovered!\n\n"
-                    f"Title: {event.title}\n"
-                    f"City: {event.city}\n"
-                    f"Type: {event.event_type}\n"
-                    f"Score: {event.relevance_score}\n"
-                    f"{food_text}\n\n"
-                    f"View: {event.url}"
-                )
-                send_email(
-                    to=user.email,
-                    subject=f"HackPlate: {event.title}",
-                    body=body,
-                )
-
-
-def _matches(event: models.Event, rule: models.NotificationRule) -> bool:
-    """Check if event matches a notification rule."""
-    if event.relevance_score < rule.min_score:
-        return False
-    if rule.food_required and event.food_score == 0:
-        return False
-    if rule.location:
-        rule_lat, rule_lon = geocode(rule.location)
-        if not rule_lat or not rule_lon:
-            if event.city.lower() != rule.location.lower():
-                return False
-        elif event.lat and event.lon:
-            dist = haversine(rule_lat, rule_lon, event.lat, event.lon)
-            if dist > rule.radius_km:
-                return False
-        else:
-            if event.city.lower() != rule.location.lower():
-                return False
-    return True
 
+def _event_email_body(event: models.Event) -> str:
+    food_text = "🍕 Food available" if event.food_score > 0 else "No food info"
+    return (
+        f"New event discovered!\n\n"
+        f"Title: {event.title}\n"
+        f"City: {event.city}\n"
+        f"Type: {event.event_type}\n"
+        f"Score: {event.relevance_score}\n"
+        f"{food_text}\n\n"
+        f"View: {event.url}"
+    )
 
-def _dispatch_rule(event: models.Event, rule: models.NotificationRule):
-    """Send notification for a matched rule."""
-    keywords = event.keywords if isinstance(event.keywords, list) else []
+
+def _dispatch_rule(db: Session, event: models.Event, rule: models.NotificationRule):
+    """Queue the notification for a matched rule."""
     if rule.channel == "telegram":
-        send_telegram(
-            title=event.title, url=event.url, city=event.city,
-            event_type=event.event_type, score=event.relevance_score,
-            keywords=keywords,
-        )
+        _queue_telegram(db, event)
     elif rule.channel == "email":
         user_email = rule.user.email if rule.user else None
         if user_email:
-            send_email(
-                to=user_email,
-                subject=f"HackPlate: {event.title}",
-                body=f"Score: {event.relevance_score}\nCity: {event.city}\nURL: {event.url}",
+            _queue_email(
+                db, user_email, f"HackPlate: {event.title}",
+                f"Score: {event.relevance_score}\nCity: {event.city}\nURL: {event.url}",
             )
+
+
+def _queue_telegram(db: Session, event: models.Event):
+    if not telegram.configured():
+        print("  [telegram] Not configured -- skipping")
+        return
+    keywords = event.keywords if isinstance(event.keywords, list) else []
+    message = telegram.format_alert(
+        title=event.title, url=event.url, city=event.city,
+        event_type=event.event_type, score=event.relevance_score,
+        keywords=keywords,
+    )
+    enqueue_message(db, "telegram", settings.TELEGRAM_CHAT_ID, message)
+
+
+def _queue_email(db: Session, to: str, subject: str, body: str):
+    if not email.configured():
+        email.log_unsent(to, subject, body)
+        return
+    enqueue_message(db, "email", to, body, subject=subject)
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from .. import models, schemas
 from ..database import get_db
 from ..auth.utils import get_current_user
+from .subscriptions import subscription_index
 
 router = APIRouter(prefix="/notifications", tags=["notifications"])
 
@@ -38,6 +39,7 @@ def create_rule(
     db.add(rule)
     db.commit()
     db.refresh(rule)
+    subscription_index.add_rule(db, rule)
     return rule
 
 
@@ -57,4 +59,5 @@ def delete_rule(
         raise HTTPException(status_code=404, detail="Rule not found")
     db.delete(rule)
     db.commit()
+    subscription_index.remove_rule(db, rule.id)
     return {"message": "Rule deleted"}
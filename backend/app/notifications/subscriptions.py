@@ -0,0 +1,273 @@
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Hashable
+
+from .. import models
+from ..background import start_rebuild_loop
+from ..cache import bump_version, data_version
+from ..intelligence.geo import bounding_box, geocode, geocode_many, haversine, haversine_matrix, indices_within
+
+# cache_versions counter bumped whenever a rule or saved search changes
+VERSION_NAME = "subscriptions"
+
+# An area spanning more cells than this goes in the "everywhere" group instead
+MAX_CELLS = 1024
+
+# Groups inside a bucket:
+#   ("cell", row, col)   gridded areas; candidates get the distance check
+#   ("city", name)       rules that don't geocode: match on city name alone
+#   ("fallback", name)   gridded rules, for events without coordinates (city name decides)
+#   UNLOCATED            gridded saved searches, for events without coordinates (always match)
+#   EVERYWHERE           no location filter, or too wide to grid; candidates get the full check
+EVERYWHERE = ("everywhere",)
+UNLOCATED = ("unlocated",)
+
+
+@dataclass(frozen=True)
+class Subscription:
+    """
+    A notification rule or saved search, reduced to what event matching needs.
+    key is ("rule", rule_id) or ("search", user_id).
+    """
+    key: tuple[str, Hashable]
+    min_score: int
+    food_required: bool
+    lat: float | None = None
+    lon: float | None = None
+    radius_km: float = 50
+    city: str | None = None  # lowercased; compared to Event.city when distance can't decide
+
+    @property
+    def located(self) -> bool:
+        return bool(self.lat and self.lon)
+
+    def matches(self, event: models.Event) -> bool:
+        if event.relevance_score < self.min_score:
+            return False
+        if self.food_required and event.food_score == 0:
+            return False
+        if self.located and event.lat and event.lon:
+            return haversine(self.lat, self.lon, event.lat, event.lon) <= self.radius_km
+        if self.city is not None:
+            return (event.city or "").lower() == self.city
+        return True
+
+
+def rule_subscription(rule: models.NotificationRule, center: tuple[float | None, float | None]) -> Subscription:
+    """A rule matches within radius_km of its geocoded location, or by city name when that can't be used."""
+    lat, lon = center
+    return Subscription(
+        key=("rule", rule.id), min_score=rule.min_score or 0, food_required=bool(rule.food_required),
+        lat=lat, lon=lon, radius_km=rule.radius_km or 0,
+        city=rule.location.lower() if rule.location else None,
+    )
+
+
+def search_subscription(search: models.SavedSearch) -> Subscription:
+    return Subscription(
+        key=("search", search.user_id), min_score=search.min_score or 0, food_required=bool(search.food_required),
+        lat=search.latitude, lon=search.longitude, radius_km=search.radius_km or 0,
+    )
+
+
+class SubscriptionIndex:
+    """
+    Inverted index from event attributes to the subscriptions that could match.
+
+    Subscriptions are bucketed by (min_score, food_required), and inside a bucket
+    by the lat/lon grid cells their radius covers (plus city name for rules). An
+    event only visits buckets whose thresholds it passes and, in each, the groups
+    for its own cell and city; candidates then get the exact distance check.
+    """
+
+    def __init__(self, cell_deg: float = 0.5):
+        self.cell_deg = cell_deg
+        self._n_cols = round(360 / cell_deg)
+        self._entries: dict[Hashable, Subscription] = {}
+        self._buckets: dict[tuple[int, bool], dict[tuple, set]] = {}
+        self._placed: dict[Hashable, list[tuple]] = {}
+        self._lock = threading.RLock()
+        self.ready = False
+        self.built_at = 0.0
+        self.version: int | None = None  # subscriptions version the index was built at
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def _cell(self, lat: float, lon: float) -> tuple[str, int, int]:
+        return ("cell", math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg) % self._n_cols)
+
+    def _groups(self, sub: Subscription) -> list[tuple]:
+        if sub.located:
+            min_lat, max_lat, min_lon, max_lon = bounding_box(sub.lat, sub.lon, sub.radius_km)
+            if min_lon is None:
+                return [EVERYWHERE]
+            rows = range(math.floor(min_lat / self.cell_deg), math.floor(max_lat / self.cell_deg) + 1)
+            cols = range(math.floor(min_lon / self.cell_deg), math.floor(max_lon / self.cell_deg) + 1)
+            if len(rows) * len(cols) > MAX_CELLS:
+                return [EVERYWHERE]
+            groups = [("cell", r, c % self._n_cols) for r in rows for c in cols]
+            groups.append(("fallback", sub.city) if sub.city is not None else UNLOCATED)
+            return groups
+        if sub.city is not None:
+            return [("city", sub.city)]
+        return [EVERYWHERE]
+
+    def add(self, sub: Subscription):
+        """Index a subscription, replacing any previous one with the same key."""
+        with self._lock:
+            self.remove(sub.key)
+            bucket = self._buckets.setdefault((sub.min_score, sub.food_required), {})
+            groups = self._groups(sub)
+            for group in groups:
+                bucket.setdefault(group, set()).add(sub.key)
+            self._entries[sub.key] = sub
+            self._placed[sub.key] = groups
+
+    def remove(self, key: Hashable):
+        with self._lock:
+            sub = self._entries.pop(key, None)
+            if sub is None:
+                return
+            bucket_key = (sub.min_score, sub.food_required)
+            bucket = self._buckets[bucket_key]
+            for group in self._placed.pop(key):
+                members = bucket[group]
+                members.discard(key)
+                if not members:
+                    del bucket[group]
+            if not bucket:
+                del self._buckets[bucket_key]
+
+    def add_rule(self, db, rule: models.NotificationRule):
+        """Index a rule committed by this process (see _committed)."""
+        sub = rule_subscription(rule, geocode(rule.location) if rule.location else (None, None))
+        self._committed(db, lambda: self.add(sub))
+
+    def remove_rule(self, db, rule_id):
+        self._committed(db, lambda: self.remove(("rule", rule_id)))
+
+    def add_search(self, db, search: models.SavedSearch):
+        sub = search_subscription(search)
+        self._committed(db, lambda: self.add(sub))
+
+    def _committed(self, db, change):
+        """
+        Apply a committed change here and bump the shared version so other
+        processes rebuild. If nothing else changed since this index was synced,
+        it stays current without a rebuild of its own.
+        """
+        version = bump_version(db, VERSION_NAME)
+        with self._lock:
+            change()
+            if self.version == version - 1:
+                self.version = version
+
+    def candidates(self, event: models.Event) -> tuple[set, set]:
+        """
+        Keys of subscriptions that might match the event, as (certain, to_check):
+        the first set matches outright, the second still needs Subscription.matches.
+        """
+        city = (event.city or "").lower()
+        if event.lat and event.lon:
+            certain_groups, check_groups = [("city", city)], [self._cell(event.lat, event.lon), EVERYWHERE]
+        else:
+            certain_groups, check_groups = [("city", city), ("fallback", city), UNLOCATED], [EVERYWHERE]
+        certain, to_check = set(), set()
+        with self._lock:
+            for (min_score, food_required), bucket in self._buckets.items():
+                if event.relevance_score < min_score or (food_required and event.food_score == 0):
+                    continue
+                for groups, found in ((certain_groups, certain), (check_groups, to_check)):
+                    for group in groups:
+                        members = bucket.get(group)
+                        if members:
+                            found.update(members)
+        return certain, to_check
+
+    def match(self, events: list[models.Event]) -> dict[Hashable, list[int]]:
+        """Subscription key -> positions in events that it matches."""
+        hits: dict[Hashable, list[int]] = {}
+        entries = self._entries
+        by_cell: dict[tuple, list[tuple[int, set]]] = {}
+        for i, event in enumerate(events):
+            certain, to_check = self.candidates(event)
+            for key in certain:
+                hits.setdefault(key, []).append(i)
+            if event.lat and event.lon:
+                by_cell.setdefault(self._cell(event.lat, event.lon), []).append((i, to_check))
+                continue
+            for key in to_check:
+                sub = entries.get(key)
+                if sub is not None and sub.matches(event):
+                    hits.setdefault(key, []).append(i)
+        for checks in by_cell.values():
+            self._match_cell(events, checks, entries, hits)
+        for positions in hits.values():
+            positions.sort()
+        return hits
+
+    def _match_cell(self, events: list, checks: list[tuple[int, set]], entries: dict, hits: dict):
+        """
+        Check one cell's located events against their candidates: every located
+        candidate in a single haversine_matrix call, the rest one by one.
+        Candidates already passed their bucket's score / food thresholds.
+        """
+        located, other = [], []
+        for key in set().union(*(to_check for _, to_check in checks)):
+            sub = entries.get(key)
+            if sub is not None:
+                (located if sub.located else other).append(sub)
+
+        if located:
+            distances = haversine_matrix(
+                [events[i].lat for i, _ in checks], [events[i].lon for i, _ in checks],
+                [sub.lat for sub in located], [sub.lon for sub in located],
+            )
+            radii = [sub.radius_km for sub in located]
+            for (i, to_check), row in zip(checks, distances):
+                for j in indices_within(row, radii):
+                    if located[j].key in to_check:
+                        hits.setdefault(located[j].key, []).append(i)
+
+        for sub in other:
+            for i, to_check in checks:
+                if sub.key in to_check and sub.matches(events[i]):
+                    hits.setdefault(sub.key, []).append(i)
+
+    def build(self, db):
+        """Load every rule and saved search. Swaps the index in atomically once loaded."""
+        # Read before the rows: a change committed after this shows up as a newer version
+        version = data_version(db, VERSION_NAME)
+        rules = db.query(models.NotificationRule).all()
+        centers = geocode_many(rule.location for rule in rules if rule.location)
+        fresh = SubscriptionIndex(self.cell_deg)
+        for rule in rules:
+            fresh.add(rule_subscription(rule, centers.get(rule.location, (None, None))))
+        for search in db.query(models.SavedSearch):
+            fresh.add(search_subscription(search))
+
+        with self._lock:
+            self._entries, self._buckets, self._placed = fresh._entries, fresh._buckets, fresh._placed
+            self.ready = True
+            self.built_at = time.monotonic()
+            self.version = version
+        print(f"  [subscriptions] Indexed {len(self)} rules and saved searches")
+
+    def sync(self, db):
+        """Rebuild if any process has changed a rule or saved search since the last build."""
+        if not self.ready or self.version != data_version(db, VERSION_NAME):
+            self.build(db)
+
+
+subscription_index = SubscriptionIndex()
+
+
+def start_subscription_index(session_factory, refresh_seconds: int):
+    """Build the subscription index at startup and refresh it every refresh_seconds (sync() catches changes in between)."""
+    return start_rebuild_loop("subscriptions", subscription_index.build, session_factory, refresh_seconds)
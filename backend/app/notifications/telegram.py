@@ -1,19 +1,18 @@
-import requests
 from ..config import get_settings
 
 settings = get_settings()
 
+# Events listed in one digest message; keeps it under Telegram's 4096-character limit
+DIGEST_MAX_ITEMS = 20
 
-def send_telegram(title: str, url: str, city: str,
-                  event_type: str, score: int, keywords: list[str]) -> bool:
-    """Send a Telegram alert for a detected event."""
-    token = settings.TELEGRAM_BOT_TOKEN
-    chat_id = settings.TELEGRAM_CHAT_ID
 
-    if not token or not chat_id:
-        print("  [telegram] Not configured -- skipping")
-        return False
+def configured() -> bool:
+    return bool(settings.TELEGRAM_BOT_TOKEN and settings.TELEGRAM_CHAT_ID)
 
+
+def format_alert(title: str, url: str, city: str,
+                 event_type: str, score: int, keywords: list[str]) -> str:
+    """Telegram alert text for a detected event (HTML parse mode)."""
     # Use HTML parse mode to avoid Markdown escaping issues
     kw_text = ", ".join(keywords[:5]) if keywords else "—"
     food_icon = "🍕 " if any(k in ["food", "meals", "lunch", "dinner", "snacks"] for k in keywords) else ""
@@ -25,26 +24,30 @@ def send_telegram(title: str, url: str, city: str,
         f"{food_icon}Keywords: {_escape_html(kw_text)}\n\n"
         f'<a href="{url}">View Event →</a>'
     )
+    return message
+
 
-    try:
-        resp = requests.post(
-            f"https://api.telegram.org/bot{token}/sendMessage",
-            json={
-                "chat_id": chat_id,
-                "text": message,
-                "parse_mode": "HTML",
-                "disable_web_page_preview": False,
-            },
-            timeout=10,
+def format_digest(heading: str, events: list) -> str:
+    """One Telegram message listing many events (title, url, city, relevance_score, food_score)."""
+    lines = [f"<b>{_escape_html(heading)}</b>\n"]
+    for event in events[:DIGEST_MAX_ITEMS]:
+        food_icon = "🍕 " if event.food_score > 0 else ""
+        lines.append(
+            f'{food_icon}<a href="{event.url}">{_escape_html(event.title)}</a>'
+            f" · {_escape_html(event.city)} · score {event.relevance_score}"
         )
-        if resp.status_code == 200:
-            print(f"  [telegram] Alert sent: {title}")
-            return True
-        print(f"  [telegram] Error {resp.status_code}: {resp.text[:200]}")
-        return False
-    except Exception as e:
-        print(f"  [telegram] Failed: {e}")
-        return False
+    if len(events) > DIGEST_MAX_ITEMS:
+        lines.append(f"\n…and {len(events) - DIGEST_MAX_ITEMS} more")
+    return "\n".join(lines)
+
+
+def message_payload(chat_id: str, message: str) -> dict:
+    return {
+        "chat_id": chat_id,
+        "text": message,
+        "parse_mode": "HTML",
+        "disable_web_page_preview": False,
+    }
 
 
 def _escape_html(text: str) -> str:
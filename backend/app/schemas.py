@@ -83,3 +83,21 @@ class AnalyticsOverview(BaseModel):
 class AnalyticsTrend(BaseModel):
     date: str
     count: int
+
+
+# --- Ingestion ---
+class IngestionJobResponse(BaseModel):
+    id: UUID
+    status: str
+    sources: list[str]
+    limit: int
+    trigger: str
+    stages: dict[str, float]
+    result: dict | None
+    error: str | None
+    created_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,58 @@
+"""
+Text analysis stage over a large batch of synthetic events: in-process vs the
+chunked process pool analyze_many switches to for big batches (backfills,
+re-scoring). Checks both give the same results.
+
+    cd backend
+    python benchmarks/bench_analysis.py [--events 50000] [--workers 4]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.intelligence.analysis import _analyze_chunk, analyze_many  # noqa: E402
+from app.intelligence.geo import KNOWN_CITIES  # noqa: E402
+
+PHRASES = ["A 36 hour hackathon", "free food and snacks", "meals provided", "online and offline",
+           "sponsored by GitHub and Polygon", "prizes worth 2 lakh", "in-person at the campus",
+           "Build your project with mentors", "Register before the deadline."]
+
+
+def synthetic_items(n: int, rnd: random.Random) -> list[tuple[str, str]]:
+    items = []
+    for _ in range(n):
+        description = " ".join(rnd.choice(PHRASES) for _ in range(rnd.randint(60, 160)))[:5000]
+        location_text = f"Venue in {rnd.choice(KNOWN_CITIES)}. " + description[:2000]
+        items.append((description, location_text))
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=50_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    items = synthetic_items(args.events, random.Random(7))
+
+    start = time.perf_counter()
+    inline = _analyze_chunk(items)
+    inline_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pooled = analyze_many(items, workers=max(args.workers, 2))
+    pooled_s = time.perf_counter() - start
+    assert pooled == inline, "process pool results differ from in-process analysis"
+
+    print(f"{args.events} events, {os.cpu_count()} CPUs")
+    print(f"  in-process:            {inline_s:7.2f} s")
+    print(f"  process pool ({max(args.workers, 2)} w):   {pooled_s:7.2f} s  ({inline_s / pooled_s:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
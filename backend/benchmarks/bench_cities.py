@@ -0,0 +1,84 @@
+"""
+City extraction on ~5000-char page texts as the city list grows: the old
+per-city re.search loop vs CityMatcher's single trie-factored regex.
+Synthetic city names pad the bundled list out to each size.
+
+    cd backend
+    python benchmarks/bench_cities.py [--texts 200] [--sizes 30,1000,5000]
+"""
+import argparse
+import random
+import re
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.intelligence.geo import KNOWN_CITIES, CityMatcher  # noqa: E402
+
+FILLER = ("Register your team before the deadline. Mentors, workshops and a demo day "
+          "with judges from the sponsor companies. ").split()
+
+
+def synthetic_cities(n: int, rnd: random.Random) -> list[str]:
+    names = list(KNOWN_CITIES)
+    while len(names) < n:
+        name = "".join(rnd.choices(string.ascii_lowercase, k=rnd.randint(5, 11))).title()
+        names.append(name if rnd.random() < 0.8 else f"{name} {rnd.choice(['Nagar', 'Pur', 'City'])}")
+    return names[:n]
+
+
+def synthetic_pages(n: int, cities: list[str], rnd: random.Random) -> list[str]:
+    pages = []
+    for _ in range(n):
+        words, length = [], 0
+        while length < 5000:
+            word = rnd.choice(cities) if rnd.random() < 0.005 else rnd.choice(FILLER)
+            words.append(word)
+            length += len(word) + 1
+        pages.append(" ".join(words))
+    return pages
+
+
+def legacy(text: str, cities: list[str]) -> str:
+    """The old extract_location: one re.search per known city, in list order."""
+    for city in cities:
+        if re.search(r'\b' + re.escape(city) + r'\b', text, re.IGNORECASE):
+            return city
+    return "Unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--texts", type=int, default=200)
+    parser.add_argument("--sizes", default="30,1000,5000")
+    args = parser.parse_args()
+
+    rnd = random.Random(7)
+    print(f"{args.texts} pages, ~5000 chars each")
+    print(f"{'cities':>7} {'legacy us/page':>15} {'matcher us/page':>16} {'compile ms':>11}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        cities = synthetic_cities(size, rnd)
+        pages = synthetic_pages(args.texts, cities, rnd)
+
+        start = time.perf_counter()
+        for page in pages:
+            legacy(page, cities)
+        legacy_us = (time.perf_counter() - start) / len(pages) * 1e6
+
+        start = time.perf_counter()
+        matcher = CityMatcher({city: city for city in cities})
+        compile_ms = (time.perf_counter() - start) * 1e3
+
+        start = time.perf_counter()
+        for page in pages:
+            matcher.find(page, "most_frequent")
+        matcher_us = (time.perf_counter() - start) / len(pages) * 1e6
+
+        print(f"{size:>7} {legacy_us:>15.0f} {matcher_us:>16.0f} {compile_ms:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
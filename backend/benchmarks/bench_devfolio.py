@@ -0,0 +1,125 @@
+"""
+Devfolio detail-page extraction against locally served HTML fixtures:
+per-run Chromium + one serial page (the old scraper) vs the shared BrowserPool
+with parallel pages and images/fonts/media blocked.
+
+    cd backend
+    playwright install chromium
+    python benchmarks/bench_devfolio.py [--pages 20] [--latency 0.05] [--runs 3]
+"""
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.ingestion.browser import browser_pool  # noqa: E402
+from app.ingestion.devfolio import DevfolioScraper  # noqa: E402
+
+PAGE = """<!doctype html>
+<html><head><title>Fixture Hack {i} | Devfolio</title>
+<link rel="preload" href="/font.woff2" as="font" crossorigin>
+</head><body>
+<h1>Fixture Hack {i}</h1>
+<img src="/banner-{i}.png" width="1200" height="400">
+<p>A 36 hour hackathon in Bengaluru. Free food, meals provided, prizes worth 5 lakh.</p>
+{filler}
+</body></html>
+"""
+
+
+def write_fixtures(root: Path, n: int):
+    filler = "<p>" + "Build something great with the community. " * 200 + "</p>"
+    for i in range(n):
+        (root / f"hack-{i}.html").write_text(PAGE.format(i=i, filler=filler))
+        (root / f"banner-{i}.png").write_bytes(b"\x89PNG" + b"\0" * 200_000)
+    (root / "font.woff2").write_bytes(b"\0" * 100_000)
+
+
+def serve(root: Path, latency: float) -> ThreadingHTTPServer:
+    class SlowHandler(SimpleHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)  # simulated network round trip
+            super().do_GET()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(SlowHandler, directory=str(root)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def old_scraper_run(scraper: DevfolioScraper, urls: list[str]) -> int:
+    """What DevfolioScraper.scrape used to do per ingestion: launch, serial networkidle navigation."""
+    from playwright.sync_api import sync_playwright
+
+    results = 0
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_context(user_agent=scraper.USER_AGENT).new_page()
+        for url in urls:
+            page.goto(url, wait_until="networkidle")
+            if scraper._parse(page.content(), url):
+                results += 1
+        browser.close()
+    return results
+
+
+def pooled_run(scraper: DevfolioScraper, urls: list[str]) -> int:
+    async def _run():
+        context = await browser_pool.new_context(user_agent=scraper.USER_AGENT)
+        try:
+            return await scraper._extract_all(context, urls)
+        finally:
+            await context.close()
+
+    return len(browser_pool.run(_run))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    scraper = DevfolioScraper()
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        write_fixtures(root, args.pages)
+        server = serve(root, args.latency)
+        urls = [f"http://127.0.0.1:{server.server_port}/hack-{i}.html" for i in range(args.pages)]
+
+        old = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            assert old_scraper_run(scraper, urls) == args.pages
+            old.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        browser_pool.start()
+        launch_s = time.perf_counter() - start
+
+        pooled = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            assert pooled_run(scraper, urls) == args.pages
+            pooled.append(time.perf_counter() - start)
+        browser_pool.stop()
+        server.shutdown()
+
+    print(f"{args.pages} pages, {args.latency * 1000:.0f} ms simulated latency, "
+          f"concurrency {scraper.max_concurrency}")
+    print(f"  old (launch + serial):  best {min(old):6.2f}s  mean {sum(old) / len(old):6.2f}s")
+    print(f"  pool (one-off launch {launch_s:.2f}s, parallel pages):  "
+          f"best {min(pooled):6.2f}s  mean {sum(pooled) / len(pooled):6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Offline gazetteer on a synthetic GeoNames-format file: build time, cost of the
+first (lazy, memory-mapping) lookup, then forward and reverse lookup latency.
+
+    cd backend
+    python benchmarks/bench_gazetteer.py [--places 200000] [--lookups 20000]
+"""
+import argparse
+import random
+import string
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.intelligence.gazetteer import Gazetteer  # noqa: E402
+
+
+def write_source(path: Path, n: int, rnd: random.Random) -> list[str]:
+    names = []
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(n):
+            name = "".join(rnd.choices(string.ascii_lowercase, k=rnd.randint(4, 12))).title()
+            alternates = ",".join(name + suffix for suffix in rnd.sample(["pur", "abad", " Nagar", "ville"], 2))
+            lat, lon = rnd.uniform(-60, 70), rnd.uniform(-180, 180)
+            cols = [str(i), name, name, alternates, f"{lat:.4f}", f"{lon:.4f}", "P", "PPL", "XX",
+                    "", "", "", "", "", str(rnd.randint(1000, 10_000_000)), "", "", "", "2024-01-01"]
+            f.write("\t".join(cols) + "\n")
+            names.append(name)
+    return names
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--places", type=int, default=200_000)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    args = parser.parse_args()
+
+    rnd = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        source, out = Path(tmp) / "places.tsv", Path(tmp) / "places.bin"
+        names = write_source(source, args.places, rnd)
+        queries = [rnd.choice(names) if rnd.random() < 0.8 else "Nowhere Land" for _ in range(args.lookups)]
+
+        start = time.perf_counter()
+        Gazetteer(str(out), str(source)).lookup("warm")  # builds the binary
+        build_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        gazetteer = Gazetteer(str(out), str(source))
+        init_us = (time.perf_counter() - start) * 1e6
+        start = time.perf_counter()
+        gazetteer.lookup(queries[0])
+        first_ms = (time.perf_counter() - start) * 1e3
+
+        start = time.perf_counter()
+        found = sum(gazetteer.lookup(q) is not None for q in queries)
+        lookup_us = (time.perf_counter() - start) / len(queries) * 1e6
+
+        points = [(rnd.uniform(-60, 70), rnd.uniform(-180, 180)) for _ in range(200)]
+        start = time.perf_counter()
+        for lat, lon in points:
+            gazetteer.reverse(lat, lon)
+        reverse_ms = (time.perf_counter() - start) / len(points) * 1e3
+
+        print(f"{args.places} places, {out.stat().st_size / 1e6:.1f} MB binary")
+        print(f"  build from TSV:          {build_s:8.2f} s (once)")
+        print(f"  construct Gazetteer:     {init_us:8.1f} us (nothing loaded)")
+        print(f"  first lookup (mmap):     {first_ms:8.2f} ms")
+        print(f"  lookup:                  {lookup_us:8.1f} us  ({found}/{len(queries)} found)")
+        print(f"  reverse (full scan):     {reverse_ms:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
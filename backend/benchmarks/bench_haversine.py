@@ -0,0 +1,54 @@
+"""
+Notification fan-out distance checks: scalar haversine loop vs haversine_matrix.
+
+    cd backend
+    python benchmarks/bench_haversine.py [--subscribers 5000] [--events 200]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.intelligence.geo import haversine, haversine_matrix, indices_within, np  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subscribers", type=int, default=5000)
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--radius", type=float, default=50.0)
+    args = parser.parse_args()
+
+    if np is None:
+        print("NumPy not installed -- haversine_matrix falls back to the scalar loop")
+
+    rnd = random.Random(42)
+    subs = [(rnd.uniform(8, 32), rnd.uniform(69, 92)) for _ in range(args.subscribers)]
+    events = [(rnd.uniform(8, 32), rnd.uniform(69, 92)) for _ in range(args.events)]
+    ev_lats = [lat for lat, _ in events]
+    ev_lons = [lon for _, lon in events]
+
+    start = time.perf_counter()
+    scalar_hits = sum(
+        1 for slat, slon in subs for elat, elon in events
+        if haversine(slat, slon, elat, elon) <= args.radius
+    )
+    scalar_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matrix = haversine_matrix([s[0] for s in subs], [s[1] for s in subs], ev_lats, ev_lons)
+    matrix_hits = sum(len(indices_within(row, args.radius)) for row in matrix)
+    matrix_s = time.perf_counter() - start
+
+    assert scalar_hits == matrix_hits
+    pairs = args.subscribers * args.events
+    print(f"{pairs} subscriber x event pairs, {scalar_hits} within {args.radius:g} km")
+    print(f"  scalar loop      {scalar_s * 1000:9.1f} ms")
+    print(f"  haversine_matrix {matrix_s * 1000:9.1f} ms  ({scalar_s / matrix_s:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
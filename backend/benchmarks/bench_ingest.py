@@ -0,0 +1,105 @@
+"""
+Persistence stage for 50k synthetic RawEvents: row-at-a-time SELECT + db.add
+(the old run_ingestion loop) vs the batched INSERT ... ON CONFLICT upsert.
+
+Uses throwaway SQLite files unless --database-url points somewhere else.
+
+    cd backend
+    python benchmarks/bench_ingest.py [--events 50000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+CITIES = ["Mumbai", "Pune", "Bangalore", "Delhi", "Hyderabad", "Chennai", "Kochi"]
+
+
+def synthetic_raw_events(n: int, rnd: random.Random, revision: int = 0):
+    from app.ingestion.base import RawEvent
+
+    return [
+        RawEvent(
+            title=f"Synthetic Hack {i}",
+            description=(f"rev {revision}. A {rnd.choice(['24 hour', '36 hour', 'weekend'])} hackathon in "
+                         f"{rnd.choice(CITIES)} with {rnd.choice(['free food', 'pizza', 'snacks', 'prizes'])}. ") * 20,
+            url=f"https://example.com/hack/{i}",
+            location_text=rnd.choice(CITIES),
+            start_date=None,
+            source=rnd.choice(["devfolio", "unstop"]),
+        )
+        for i in range(n)
+    ]
+
+
+def row_at_a_time(db, rows):
+    """The pre-batching loop: one existence query and one ORM add per event."""
+    from app import models
+    from app.ingestion.persistence import UPDATE_COLUMNS
+
+    for row in rows:
+        existing = db.query(models.Event).filter(models.Event.url == row["url"]).first()
+        if existing:
+            for col in UPDATE_COLUMNS:
+                setattr(existing, col, row[col])
+        else:
+            db.add(models.Event(**row))
+    db.commit()
+
+
+def batched(db, rows):
+    from app.ingestion.persistence import upsert_events
+
+    upsert_events(db, rows)
+    db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=50_000)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    results = {}
+    for name, persist in (("row-at-a-time", row_at_a_time), ("batched upsert", batched)):
+        os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tmp}/{name.replace(' ', '_')}.db"
+        for mod in [m for m in sys.modules if m == "app" or m.startswith("app.")]:
+            del sys.modules[mod]
+
+        from app.database import Base, SessionLocal, engine, init_db
+        from app.intelligence.analysis import analyze
+        from app.ingestion.runner import _event_row
+
+        Base.metadata.drop_all(engine)
+        init_db()
+
+        rnd = random.Random(7)
+        first, second = (
+            [_event_row(r, r.content_hash(), analyze(r.description, r.location_text)) for r in raw]
+            for raw in (synthetic_raw_events(args.events, rnd), synthetic_raw_events(args.events, rnd, revision=1))
+        )
+
+        timings = []
+        for rows in (first, second):  # fresh inserts, then every row updated
+            db = SessionLocal()
+            start = time.perf_counter()
+            persist(db, rows)
+            timings.append(time.perf_counter() - start)
+            db.close()
+        results[name] = timings
+        engine.dispose()
+
+    print(f"{args.events} events")
+    print(f"{'':>16} {'insert s':>9} {'update s':>9}")
+    for name, (ins, upd) in results.items():
+        print(f"{name:>16} {ins:>9.2f} {upd:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
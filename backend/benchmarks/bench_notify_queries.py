@@ -0,0 +1,102 @@
+"""
+SQL statements (execute() calls) issued by match_and_notify for 5 and for 50
+subscribers. The count must not grow with the number of users, rules or saved
+searches; exits non-zero if it does (an N+1 crept back in).
+
+Always runs against a fresh SQLite file in a new temp directory, never a
+configured database.
+
+    cd backend
+    python benchmarks/bench_notify_queries.py [--events 200]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import uuid
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Near Mumbai, so every rule and saved search below has something to match
+CENTER = (19.07, 72.87)
+
+
+def add_subscribers(db, n: int, rnd: random.Random):
+    """n users with preferences, one Mumbai rule each and (for two in three) a saved search."""
+    from app import models
+
+    for i in range(n):
+        user = models.User(clerk_id=f"bench-{uuid.uuid4().hex}", email=f"bench{i}-{uuid.uuid4().hex[:6]}@example.com")
+        db.add(user)
+        db.flush()
+        db.add(models.NotificationPreference(user_id=user.id, telegram_enabled=i % 2 == 0, email_enabled=True))
+        db.add(models.NotificationRule(user_id=user.id, location="Mumbai", radius_km=100, min_score=3,
+                                       food_required=False, channel=rnd.choice(["email", "telegram"])))
+        if i % 3:
+            db.add(models.SavedSearch(user_id=user.id, latitude=CENTER[0], longitude=CENTER[1], radius_km=200,
+                                      min_score=3, food_required=i % 2 == 0))
+    db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=200)
+    args = parser.parse_args()
+
+    # Set before any app import: the engine is built from it
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/notify.db"
+
+    from sqlalchemy import event as sa_event
+
+    from app import models
+    from app.database import SessionLocal, engine, init_db
+    from app.intelligence import geo
+    from app.notifications import email, engine as notify, telegram
+
+    geo.set_geocoder(lambda query: None)  # offline: gazetteer / built-in coordinates only
+    telegram.configured = lambda: True  # queue messages for every channel (nothing is sent)
+    email.configured = lambda: True
+
+    init_db()
+    rnd = random.Random(42)
+    with SessionLocal() as db:
+        db.add_all(
+            models.Event(title=f"Bench Hack {i}", url=f"https://example.com/bench/{i}", city="Mumbai",
+                         lat=CENTER[0] + rnd.uniform(-0.5, 0.5), lon=CENTER[1] + rnd.uniform(-0.5, 0.5),
+                         food_score=rnd.randint(0, 3), relevance_score=rnd.randint(0, 9), keywords=["food"])
+            for i in range(args.events)
+        )
+        db.commit()
+
+    # One entry per execute() call; a bulk INSERT the driver splits into 1000-row batches still counts once
+    statements: list[str] = []
+    sa_event.listen(engine, "before_execute", lambda conn, clause, *rest: statements.append(str(clause)))
+
+    counts = {}
+    with SessionLocal() as db:
+        total = 0
+        for n in (5, 50):
+            add_subscribers(db, n - total, rnd)
+            total = n
+            events = db.query(models.Event).all()
+            notify.subscription_index.build(db)
+            queued = db.query(models.OutboxMessage).count()
+
+            statements.clear()
+            notify.match_and_notify(db, events)
+            counts[n] = len(statements)
+            kinds = Counter(sql.split()[0] for sql in statements)
+            queued = db.query(models.OutboxMessage).count() - queued
+            print(f"{n:>3} subscribers: {counts[n]:>3} statements {dict(kinds)}, {queued} messages queued")
+            assert queued > 0, "nothing matched -- the check would prove nothing"
+
+    if counts[5] != counts[50]:
+        sys.exit(f"statement count grows with subscribers: {counts[5]} -> {counts[50]}")
+    print("ok: constant statement count")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Radius / nearest-neighbour queries: SpatialIndex vs the linear haversine scan.
+
+    cd backend
+    python benchmarks/bench_spatial.py [--sizes 10000 100000 1000000] [--queries 20]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.intelligence.geo import haversine  # noqa: E402
+from app.intelligence.spatial import SpatialIndex  # noqa: E402
+
+# Roughly India -- where the events actually are
+LAT_RANGE = (8.0, 32.0)
+LON_RANGE = (69.0, 92.0)
+
+
+def synthetic_points(n: int, rnd: random.Random) -> list[tuple[int, float, float]]:
+    return [(i, rnd.uniform(*LAT_RANGE), rnd.uniform(*LON_RANGE)) for i in range(n)]
+
+
+def linear_within(points, lat, lon, km):
+    return [(i, d) for i, plat, plon in points if (d := haversine(lat, lon, plat, plon)) <= km]
+
+
+def linear_nearest(points, lat, lon, k):
+    return sorted(((i, haversine(lat, lon, plat, plon)) for i, plat, plon in points), key=lambda h: h[1])[:k]
+
+
+def timed(fn, queries) -> float:
+    start = time.perf_counter()
+    for q in queries:
+        fn(*q)
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--radius", type=float, default=50.0)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    rnd = random.Random(42)
+    print(f"{'events':>10} {'build s':>8} {'scan radius ms':>15} {'index radius ms':>16} "
+          f"{'scan knn ms':>12} {'index knn ms':>13}")
+
+    for n in args.sizes:
+        points = synthetic_points(n, rnd)
+
+        start = time.perf_counter()
+        index = SpatialIndex()
+        for i, lat, lon in points:
+            index.insert(i, lat, lon)
+        build_s = time.perf_counter() - start
+
+        centers = [(rnd.uniform(*LAT_RANGE), rnd.uniform(*LON_RANGE)) for _ in range(args.queries)]
+        radius_q = [(lat, lon, args.radius) for lat, lon in centers]
+        knn_q = [(lat, lon, args.k) for lat, lon in centers]
+
+        # Sanity: both paths agree before we time them
+        lat, lon, km = radius_q[0]
+        assert {i for i, _ in index.within_radius(lat, lon, km)} == {i for i, _ in linear_within(points, lat, lon, km)}
+
+        scan_r = timed(lambda a, b, c: linear_within(points, a, b, c), radius_q)
+        idx_r = timed(index.within_radius, radius_q)
+        scan_k = timed(lambda a, b, c: linear_nearest(points, a, b, c), knn_q)
+        idx_k = timed(index.nearest, knn_q)
+
+        print(f"{n:>10} {build_s:>8.2f} {scan_r:>15.2f} {idx_r:>16.3f} {scan_k:>12.2f} {idx_k:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
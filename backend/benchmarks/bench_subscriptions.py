@@ -0,0 +1,97 @@
+"""
+Matching a batch of new events to subscriptions: the SubscriptionIndex vs
+checking every event against every rule / saved search.
+
+    cd backend
+    python benchmarks/bench_subscriptions.py [--subscriptions 100000] [--events 500]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.notifications.subscriptions import Subscription, SubscriptionIndex  # noqa: E402
+
+# Roughly India -- where the events actually are
+LAT_RANGE = (8.0, 32.0)
+LON_RANGE = (69.0, 92.0)
+CITIES = ["Mumbai", "Pune", "Bangalore", "Delhi", "Hyderabad", "Chennai", "Kochi"]
+
+
+def synthetic_subscriptions(n: int, rnd: random.Random) -> list[Subscription]:
+    subs = []
+    for i in range(n):
+        if i % 2:  # saved search: a point and a radius
+            subs.append(Subscription(
+                key=("search", i), min_score=rnd.randint(0, 6), food_required=rnd.random() < 0.3,
+                lat=rnd.uniform(*LAT_RANGE), lon=rnd.uniform(*LON_RANGE), radius_km=rnd.choice([10, 25, 50, 100]),
+            ))
+        else:  # rule: a city, geocoded most of the time
+            located = rnd.random() < 0.9
+            subs.append(Subscription(
+                key=("rule", i), min_score=rnd.randint(0, 6), food_required=rnd.random() < 0.5,
+                lat=rnd.uniform(*LAT_RANGE) if located else None, lon=rnd.uniform(*LON_RANGE) if located else None,
+                radius_km=rnd.choice([25, 50, 100]), city=rnd.choice(CITIES).lower(),
+            ))
+    return subs
+
+
+def synthetic_events(n: int, rnd: random.Random):
+    return [
+        SimpleNamespace(
+            lat=rnd.uniform(*LAT_RANGE) if rnd.random() < 0.8 else None,
+            lon=rnd.uniform(*LON_RANGE),
+            city=rnd.choice(CITIES + ["Unknown"]),
+            relevance_score=rnd.randint(0, 9),
+            food_score=rnd.randint(0, 3),
+        )
+        for _ in range(n)
+    ]
+
+
+def brute_force(subs, events):
+    hits = {}
+    for sub in subs:
+        for i, event in enumerate(events):
+            if sub.matches(event):
+                hits.setdefault(sub.key, []).append(i)
+    return hits
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subscriptions", type=int, default=100_000)
+    parser.add_argument("--events", type=int, default=500)
+    args = parser.parse_args()
+
+    rnd = random.Random(42)
+    subs = synthetic_subscriptions(args.subscriptions, rnd)
+    events = synthetic_events(args.events, rnd)
+
+    start = time.perf_counter()
+    index = SubscriptionIndex()
+    for sub in subs:
+        index.add(sub)
+    build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    indexed = index.match(events)
+    index_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = brute_force(subs, events)
+    scan_s = time.perf_counter() - start
+
+    assert indexed == expected, "index and scan disagree"
+    pairs = sum(len(v) for v in indexed.values())
+    print(f"{args.subscriptions} subscriptions x {args.events} events, {pairs} matches")
+    print(f"{'index build s':>14} {'scan s':>8} {'index s':>8} {'speedup':>8}")
+    print(f"{build_s:>14.2f} {scan_s:>8.2f} {index_s:>8.3f} {scan_s / index_s:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
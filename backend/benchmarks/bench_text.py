@@ -0,0 +1,104 @@
+"""
+Description analysis on synthetic ~5000-char event descriptions: the old
+per-function scans (detect_food, compute_score and detect_event_type each
+lowercasing the text and running one `in` per keyword) vs analyze_text's single
+compiled pass. Checks both produce identical results.
+
+    cd backend
+    pip install pyahocorasick   # optional; without it analyze_text uses the fallback scan
+    python benchmarks/bench_text.py [--texts 2000]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.intelligence import detector, geo, keywords, scorer  # noqa: E402
+from app.intelligence.text import analyze_text  # noqa: E402
+
+FILLER = ("Join builders from across the country for a weekend of shipping. Teams of up to four, "
+          "mentors on hand, judging on the final day. ").split()
+
+
+def synthetic_descriptions(n: int, rnd: random.Random) -> list[str]:
+    """Mostly prose, with roughly one signal keyword per 100 words."""
+    signals = detector.KEYWORDS + scorer.KEYWORDS + geo.EVENT_TYPE_KEYWORDS
+    texts = []
+    for _ in range(n):
+        words, length = [], 0
+        while length < 5000:
+            word = rnd.choice(signals) if rnd.random() < 0.01 else rnd.choice(FILLER)
+            words.append(word.title() if rnd.random() < 0.2 else word)
+            length += len(word) + 1
+        texts.append(" ".join(words))
+    return texts
+
+
+def legacy(text: str):
+    """The three intelligence calls as they were: each lowercases and scans on its own."""
+    text_lower = text.lower()
+    matched, food_score = [], 0
+    for keyword, score in detector.SCORING.items():
+        if keyword in text_lower and keyword not in matched:
+            matched.append(keyword)
+            food_score += score
+    if "free" in text_lower and matched:
+        food_score += 1
+    if any(sig in text_lower for sig in detector.DURATION_SIGNALS) and matched:
+        food_score += 1
+
+    t = text.lower()
+    score = food_score
+    score += min(sum(1 for k in scorer.RELEVANCE_KEYWORDS if k in t), 3)
+    score += min(sum(1 for s in scorer.SPONSOR_SIGNALS if s in t), 3)
+    if any(w in t for w in scorer.LONG_DURATION_SIGNALS):
+        score += 2
+    elif any(w in t for w in scorer.SHORT_DURATION_SIGNALS):
+        score += 1
+    if any(w in t for w in scorer.PRIZE_SIGNALS):
+        score += 1
+
+    t = text.lower()
+    if any(s in t for s in geo.HYBRID_SIGNALS):
+        event_type = "Hybrid"
+    else:
+        has_off = any(s in t for s in geo.OFFLINE_SIGNALS)
+        has_on = any(s in t for s in geo.ONLINE_SIGNALS)
+        event_type = ("Hybrid" if has_off and has_on else "Offline" if has_off
+                      else "Online" if has_on else "Unknown")
+
+    return len(matched) > 0, matched, food_score, score, event_type
+
+
+def single_pass(text: str):
+    s = analyze_text(text)
+    return s.food_detected, s.food_keywords, s.food_score, s.relevance_score, s.event_type
+
+
+def timed(fn, texts: list[str]) -> tuple[float, list]:
+    start = time.perf_counter()
+    results = [fn(t) for t in texts]
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--texts", type=int, default=2000)
+    args = parser.parse_args()
+
+    texts = synthetic_descriptions(args.texts, random.Random(7))
+    old_s, old = timed(legacy, texts)
+    new_s, new = timed(single_pass, texts)
+    assert old == new, "single-pass results differ from the legacy scans"
+
+    backend = "pyahocorasick" if keywords.ahocorasick else "substring fallback"
+    print(f"{args.texts} descriptions, ~5000 chars each ({backend})")
+    print(f"  legacy scans: {old_s / args.texts * 1e6:7.1f} us/text")
+    print(f"  single pass:  {new_s / args.texts * 1e6:7.1f} us/text  ({old_s / new_s:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
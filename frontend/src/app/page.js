@@ -1,7 +1,7 @@
 "use client";
 import { useEffect, useState } from "react";
 import { useAuth } from "@clerk/nextjs";
-import api, { getOverview, searchEvents, triggerIngest } from "../lib/api";
+import api, { getOverview, searchEvents, triggerIngest, getIngestJob } from "../lib/api";
 
 export default function Dashboard() {
     const { getToken } = useAuth();
@@ -31,7 +31,14 @@ export default function Dashboard() {
         setScanning(true);
         try {
             const token = await getToken();
-            await triggerIngest(token, 10);
+            const { data } = await triggerIngest(token, 10);
+            // Ingestion runs as a background job; poll until it finishes
+            let status = data.status;
+            while (status === "queued" || status === "running") {
+                await new Promise(r => setTimeout(r, 2000));
+                status = (await getIngestJob(token, data.job_id)).data.status;
+            }
+            if (status === "failed") alert("Scan failed.");
             refresh();
         } catch (e) {
             alert(e.response?.status === 401 ? "Sign in first." : "Scan failed.");
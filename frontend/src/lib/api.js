@@ -30,3 +30,7 @@ export const triggerIngest = (token, limit = 10) =>
     api.post(`/ingest?limit=${limit}`, {}, {
         headers: token ? { Authorization: `Bearer ${token}` } : {}
     });
+export const getIngestJob = (token, jobId) =>
+    api.get(`/ingest/${jobId}`, {
+        headers: token ? { Authorization: `Bearer ${token}` } : {}
+    });